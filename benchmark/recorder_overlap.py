@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+"""
+Measures how much of the h5 writing of ResultsRecorder is hidden behind the
+work of the main thread.
+
+The script times three runs of n iterations each:
+- the solves alone;
+- the writes alone, as record() plus flush();
+- a DMFT-like loop that solves and then records in every iteration.
+
+The overlap (t_solve + t_write - t_loop)/t_write is 1 when the writes are
+completely hidden. It is 0 when they are serialized with the solves, e.g. because
+the h5 bindings hold the GIL while writing.
+
+    python recorder_overlap.py --n-iter 10 --n-w 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description='Overlap of ResultsRecorder writes with the main thread.')
+    parser.add_argument('--n-iter', type=int, default=10, help='iterations of every run')
+    parser.add_argument('--n-iw', type=int, default=4096, help='Matsubara frequencies')
+    parser.add_argument('--n-w', type=int, default=20000, help='real frequencies')
+    args = parser.parse_args()
+
+    import triqs.operators.util as op
+    from triqs.gf import inverse, iOmega_n
+    from triqs_hubbardI import Solver, ResultsRecorder
+
+    spin_names, orb_names = ['up','down'], list(range(5))
+    gf_struct = op.set_operator_structure(spin_names, orb_names, off_diag=True)
+    U_mat = op.U_matrix_slater(l=2, U_int=4.0, J_hund=0.7, basis='spherical')
+    H = op.h_int_slater(spin_names, orb_names, U_mat, off_diag=True)
+
+    S = Solver(beta=40.0, gf_struct=gf_struct, n_iw=args.n_iw, n_w=args.n_w, verbosity=0)
+    for name, g0 in S.G0_iw: g0 << inverse(iOmega_n + 15.0)
+    solve = lambda: S.solve(h_int=H, calc_gw=True)
+    solve()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def recorder(name):
+            return ResultsRecorder(os.path.join(tmp, name + '.h5'), max_queue=args.n_iter)
+
+        start = time.perf_counter()
+        for it in range(args.n_iter):
+            solve()
+        t_solve = time.perf_counter() - start
+
+        with recorder('write') as rec:
+            start = time.perf_counter()
+            for it in range(args.n_iter):
+                rec.record_solver(S, it)
+            rec.flush()
+            t_write = time.perf_counter() - start
+
+        with recorder('loop') as rec:
+            start = time.perf_counter()
+            for it in range(args.n_iter):
+                solve()
+                rec.record_solver(S, it)
+            rec.flush()
+            t_loop = time.perf_counter() - start
+
+    print('solves alone   %8.3f s'%t_solve)
+    print('writes alone   %8.3f s'%t_write)
+    print('solve + record %8.3f s'%t_loop)
+    print('overlap        %8.2f'%((t_solve + t_write - t_loop)/t_write))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+"""
+Scaling benchmarks of the HubbardI solver.
+
+Every case solves a Slater-type shell (s, p, d or f) with diagonal, off-diagonal
+or spin-orbit coupled blocks, at a given temperature, mesh size and set of calc_*
+flags, in a fresh process. The per-stage wall times and memory use and the peak
+memory recorded in ``Solver.last_solve_stats`` are written to a JSON file, which
+can be stored as a baseline and compared against later runs:
+
+    python run_benchmarks.py --suite quick --output baseline.json
+    python run_benchmarks.py --suite quick --compare baseline.json
+
+The comparison exits with status 1 if any stage became slower or used more
+memory, or the peak memory grew, by more than the given thresholds. No network
+access is needed.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+
+U, J = 4.0, 0.7
+SOC = 0.2
+
+SHELLS = {'s': 0, 'p': 1, 'd': 2, 'f': 3}
+
+def _case_grid(shells, variants, betas, meshes, flags, backends=('atom_diag',)):
+    cases = []
+    for shell, variant, beta, mesh, flag, backend in itertools.product(shells, variants, betas, meshes, flags, backends):
+        if shell == 's' and variant == 'soc':
+            continue
+        cases.append({'shell': shell, 'variant': variant, 'beta': beta, 'flags': list(flag), 'backend': backend, **mesh})
+    return cases
+
+MESH_SMALL = {'n_iw': 1025, 'n_w': 500, 'n_tau': 10001}
+MESH_LARGE = {'n_iw': 4096, 'n_w': 2000, 'n_tau': 40001}
+
+SUITES = {
+    'quick': _case_grid(['s', 'p', 'd'], ['diag', 'offdiag', 'soc'], [40.0], [MESH_SMALL],
+                        [(), ('calc_gw', 'calc_gtau', 'calc_gl')]),
+    'full': _case_grid(['s', 'p', 'd', 'f'], ['diag', 'offdiag', 'soc'], [10.0, 40.0, 200.0],
+                       [MESH_SMALL, MESH_LARGE],
+                       [(), ('calc_gw',), ('calc_gtau', 'calc_gl'), ('calc_gw', 'calc_gtau', 'calc_gl', 'calc_dm')]),
+    'backends': _case_grid(['p', 'd', 'f'], ['diag', 'soc'], [40.0], [MESH_SMALL], [()], ['atom_diag', 'fock']),
+}
+
+def case_name(case):
+    """Unique label of a benchmark case."""
+    flags = '+'.join(f[5:] for f in case['flags']) or 'giw'
+    name = '%s-%s-beta%g-iw%d-w%d-tau%d-%s'%(case['shell'], case['variant'], case['beta'],
+                                              case['n_iw'], case['n_w'], case['n_tau'], flags)
+    if case.get('backend', 'atom_diag') != 'atom_diag':
+        name += '-' + case['backend']
+    return name
+
+def _problem(shell, variant):
+    """gf_struct and interaction of a Slater shell, with spin-orbit coupling for variant 'soc'."""
+
+    import triqs.operators.util as op
+    from triqs.operators.util.observables import LS_op
+
+    l = SHELLS[shell]
+    n_orbs = 2*l + 1
+    spin_names = ['up','down']
+    orb_names = [i for i in range(n_orbs)]
+    U_mat = op.U_matrix_slater(l=l, U_int=U, J_hund=J, basis='spherical')
+
+    if variant == 'soc':
+        mapping = {(spin, i): ('ud', i + n_orbs*s) for s, spin in enumerate(spin_names) for i in orb_names}
+        gf_struct = [('ud', 2*n_orbs)]
+        H = op.h_int_slater(spin_names, orb_names, U_mat, off_diag=True, map_operator_structure=mapping)
+        H += SOC*LS_op(spin_names, n_orbs, off_diag=True, map_operator_structure=mapping)
+    else:
+        off_diag = variant == 'offdiag'
+        gf_struct = op.set_operator_structure(spin_names, orb_names, off_diag=off_diag)
+        H = op.h_int_slater(spin_names, orb_names, U_mat, off_diag=off_diag)
+
+    return gf_struct, H, n_orbs
+
+def run_case(case, repeat):
+    """
+    Solve one case repeat times in this process and return the best time and the largest
+    memory use (change of the resident set size and increase of its peak) of every stage.
+    """
+
+    from triqs.gf import inverse, iOmega_n
+    from triqs_hubbardI import Solver
+
+    gf_struct, H, n_orbs = _problem(case['shell'], case['variant'])
+    # chemical potential of half filling
+    mu = 0.5*U*(2*n_orbs - 1) - 0.5*J*(n_orbs - 1)
+
+    S = Solver(beta=case['beta'], gf_struct=gf_struct, n_iw=case['n_iw'], n_w=case['n_w'],
+               n_tau=case['n_tau'], ad_cache_size=0, verbosity=0)
+    for name, g0 in S.G0_iw: g0 << inverse(iOmega_n + mu)
+
+    params = {flag: True for flag in case['flags']}
+    params['backend'] = case.get('backend', 'atom_diag')
+
+    stages, memory, peak = dict(), dict(), 0.0
+    for i in range(repeat):
+        S.solve(h_int=H, **params)
+        stats = S.last_solve_stats
+        for name, stage in list(stats['stages'].items()) + [('total', stats)]:
+            stages[name] = min(stages.get(name, float('inf')), stage['time'])
+        for name, stage in stats['stages'].items():
+            mem = memory.setdefault(name, {'rss_delta_mb': 0.0, 'peak_increase_mb': 0.0})
+            for key in mem:
+                mem[key] = max(mem[key], stage.get(key) or 0.0)
+        peak = max(peak, stats['peak_rss_mb'] or 0.0)
+
+    return {'case': case, 'stages': stages, 'stage_memory': memory, 'peak_rss_mb': peak,
+            'hilbert_space_dim': S.last_solve_stats['hilbert_space_dim'],
+            'subspace_sizes': S.last_solve_stats['subspace_sizes'][:10],
+            'n_poles': S.last_solve_stats['n_poles']}
+
+def _environment():
+    import numpy
+    env = {'python': platform.python_version(), 'numpy': numpy.__version__,
+           'platform': platform.platform(), 'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+    try:
+        import triqs.version
+        env['triqs'] = triqs.version.version
+    except ImportError:
+        pass
+    return env
+
+def run_suite(cases, repeat, threads):
+    """Run every case in its own process, so that the peak memory is not shared between cases."""
+
+    env = dict(os.environ)
+    for var in ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']:
+        env[var] = str(threads)
+
+    results = dict()
+    for case in cases:
+        name = case_name(case)
+        print('%-50s'%name, end=' ', flush=True)
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case),
+                               '--repeat', str(repeat)], env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print('FAILED')
+            sys.stderr.write(proc.stderr)
+            results[name] = {'case': case, 'error': proc.stderr.strip().splitlines()[-1:]}
+            continue
+        results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print('%8.3f s %8.1f MB'%(results[name]['stages']['total'], results[name]['peak_rss_mb']))
+
+    return {'environment': _environment(), 'repeat': repeat, 'threads': threads, 'cases': results}
+
+def compare(results, baseline, time_threshold, memory_threshold, min_time, min_memory=1.0):
+    """
+    Regressions of results with respect to baseline: stages that take more than
+    time_threshold times their baseline time (if that is above min_time seconds),
+    stages whose memory use exceeds memory_threshold times the baseline (if it grew
+    by more than min_memory MB) and cases whose peak memory exceeds memory_threshold
+    times the baseline.
+    """
+
+    regressions = []
+    for name, res in results['cases'].items():
+        base = baseline['cases'].get(name)
+        if base is None or 'error' in base:
+            continue
+        if 'error' in res:
+            regressions.append('%s: failed'%name)
+            continue
+        for stage, t_base in base['stages'].items():
+            t = res['stages'].get(stage)
+            if t is not None and t_base >= min_time and t > time_threshold*t_base:
+                regressions.append('%s: %s %.3f s -> %.3f s (x%.2f)'%(name, stage, t_base, t, t/t_base))
+        for stage, mem_base in base.get('stage_memory', {}).items():
+            for key, m_base in mem_base.items():
+                m = res.get('stage_memory', {}).get(stage, {}).get(key)
+                if m is not None and m - m_base > min_memory and m > memory_threshold*m_base:
+                    regressions.append('%s: %s %s %.1f MB -> %.1f MB'%(name, stage, key, m_base, m))
+        if base['peak_rss_mb'] > 0 and res['peak_rss_mb'] > memory_threshold*base['peak_rss_mb']:
+            regressions.append('%s: peak memory %.1f MB -> %.1f MB'%(name, base['peak_rss_mb'], res['peak_rss_mb']))
+    return regressions
+
+def backend_speedups(results):
+    """Ratio of the AtomDiag to the fock-backend time of the diagonalization and of the solve, for every pair of cases."""
+
+    speedups = []
+    for name, res in results['cases'].items():
+        case = res['case']
+        if case.get('backend', 'atom_diag') == 'atom_diag' or 'error' in res:
+            continue
+        ref = results['cases'].get(case_name(dict(case, backend='atom_diag')))
+        if ref is None or 'error' in ref:
+            continue
+        speedups.append('%s: diagonalization x%.2f, total x%.2f'
+                        %(name, ref['stages']['diagonalization']/res['stages']['diagonalization'],
+                          ref['stages']['total']/res['stages']['total']))
+    return speedups
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling benchmarks of the HubbardI solver.')
+    parser.add_argument('--suite', choices=sorted(SUITES), default='quick', help='grid of cases to run')
+    parser.add_argument('--filter', default='', help='only run the cases whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=3, help='solves per case, the fastest one is kept')
+    parser.add_argument('--threads', type=int, default=1, help='BLAS/OpenMP threads')
+    parser.add_argument('--output', help='write the results to this JSON file, e.g. to store a baseline')
+    parser.add_argument('--compare', help='baseline JSON file to compare the results with')
+    parser.add_argument('--time-threshold', type=float, default=1.25, help='allowed slowdown factor per stage')
+    parser.add_argument('--memory-threshold', type=float, default=1.25, help='allowed growth factor of the peak memory')
+    parser.add_argument('--min-time', type=float, default=0.05, help='stages faster than this (s) in the baseline are not compared')
+    parser.add_argument('--min-memory', type=float, default=1.0, help='memory growth of a stage below this (MB) is not a regression')
+    parser.add_argument('--list', action='store_true', help='list the cases of the suite and exit')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case), args.repeat)))
+        return 0
+
+    cases = [case for case in SUITES[args.suite] if args.filter in case_name(case)]
+    if args.list:
+        print('\n'.join(case_name(case) for case in cases))
+        return 0
+
+    results = run_suite(cases, args.repeat, args.threads)
+
+    speedups = backend_speedups(results)
+    if speedups:
+        print('\nSpeedup of the fock backend with respect to AtomDiag:')
+        print('\n'.join(speedups))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.time_threshold, args.memory_threshold, args.min_time,
+                              args.min_memory)
+        if regressions:
+            print('\n%d regressions with respect to %s:'%(len(regressions), args.compare))
+            print('\n'.join(regressions))
+            return 1
+        print('\nNo regressions with respect to %s'%args.compare)
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
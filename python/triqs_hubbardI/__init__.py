@@ -26,5 +26,8 @@ DOC
 
 """
 from .solver import Solver
+from .lehmann import AtomicLehmann
+from .multi_impurity import MultiImpuritySolver
+from .recorder import ResultsRecorder
 
-__all__ = ['Solver']
+__all__ = ['Solver', 'AtomicLehmann', 'MultiImpuritySolver', 'ResultsRecorder']
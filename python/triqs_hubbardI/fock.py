@@ -0,0 +1,206 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+class FockSpace():
+    """
+    Fock space of a set of fundamental operators, with the sparse matrices of the
+    annihilation operators in the occupation-number basis (Jordan-Wigner ordering
+    of fops). Used to build the matrix of an interaction once and to add one-body
+    terms to it without going through Operator objects.
+    """
+
+    def __init__(self, fops):
+        """
+        Parameters
+        ----------
+        fops : list of pairs [ (str,int), ...]
+               Fundamental operator set, one (block, index) pair per orbital.
+
+        """
+
+        self.fops = [tuple(f) for f in fops]
+        self.index = {f: i for i, f in enumerate(self.fops)}
+        self.dim = 2**len(self.fops)
+
+        states = np.arange(self.dim)
+        self.n_particles = np.zeros(self.dim, dtype=int)
+        for i in range(len(self.fops)):
+            self.n_particles += (states >> i) & 1
+
+        self.c = []
+        for i in range(len(self.fops)):
+            occupied = states[(states >> i) & 1 == 1]
+            below = np.zeros(len(occupied), dtype=int)
+            for j in range(i):
+                below += (occupied >> j) & 1
+            sign = 1.0 - 2*(below % 2)
+            self.c.append(sp.csr_matrix((sign, (occupied ^ (1 << i), occupied)), shape=(self.dim, self.dim)))
+        self.c_dag = [m.T.tocsr() for m in self.c]
+        self._bilinears = dict()
+
+        # (source, target) states of the nonzero elements of every c and c_dag
+        self._transitions = []
+        for m in self.c:
+            m = m.tocoo()
+            self._transitions += [(m.col, m.row), (m.row, m.col)]
+
+    def bilinear(self, i, j):
+        """Sparse matrix of c_dag(fops[i])*c(fops[j]), computed once."""
+        if (i, j) not in self._bilinears:
+            self._bilinears[(i, j)] = (self.c_dag[i] @ self.c[j]).tocsr()
+        return self._bilinears[(i, j)]
+
+    def operator_matrix(self, op):
+        """Sparse matrix of an Operator."""
+
+        H = sp.csr_matrix((self.dim, self.dim), dtype=complex)
+        for monomial, coef in op:
+            term = sp.identity(self.dim, dtype=complex, format='csr') * complex(coef)
+            for dagger, indices in monomial:
+                i = self.index[tuple(indices)]
+                term = term @ (self.c_dag[i] if dagger else self.c[i])
+            H = H + term
+        return H
+
+    def one_body_matrix(self, eal, tol=1e-12):
+        """Sparse matrix of sum_ij eal[block][i,j] c_dag(block,i) c(block,j), skipping elements below tol."""
+
+        H = sp.csr_matrix((self.dim, self.dim), dtype=complex)
+        for block, e in eal.items():
+            for ii, jj in zip(*np.nonzero(np.abs(e) > tol)):
+                H = H + e[ii,jj] * self.bilinear(self.index[(block, ii)], self.index[(block, jj)])
+        return H
+
+    def _partition(self, H, selected):
+        """
+        Invariant subspaces of H on the selected states: the connected components
+        of H, merged until every c and c_dag maps each subspace into a single one.
+        """
+
+        idx = np.nonzero(selected)[0]
+        H_sel = H[idx][:, idx]
+        n_comp, comp = connected_components(abs(H_sel) > 0, directed=False)
+        label = -np.ones(self.dim, dtype=int)
+        label[idx] = comp
+
+        while True:
+            # link all subspaces that an operator maps one subspace into to the first of them
+            rows, cols = [], []
+            for source, target in self._transitions:
+                valid = (label[source] >= 0) & (label[target] >= 0)
+                s, t = label[source[valid]], label[target[valid]]
+                first = np.full(n_comp, n_comp)
+                np.minimum.at(first, s, t)
+                rows.append(first[s])
+                cols.append(t)
+            rows, cols = np.concatenate(rows), np.concatenate(cols)
+            links = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_comp, n_comp))
+            n_merged, merged = connected_components(links, directed=False)
+            if n_merged == n_comp:
+                return label, n_comp
+            label[idx] = merged[label[idx]]
+            n_comp = n_merged
+
+    def diagonalize(self, H, n_min=None, n_max=None):
+        """
+        Diagonalize the sparse matrix H, restricted to the states with n_min to n_max particles.
+
+        Returns
+        -------
+        ad : FockDiag
+
+        """
+
+        n_min = 0 if n_min is None else n_min
+        n_max = len(self.fops) if n_max is None else n_max
+        selected = (self.n_particles >= n_min) & (self.n_particles <= n_max)
+        label, n_subspaces = self._partition(H, selected)
+        return FockDiag(self, H, label, n_subspaces)
+
+class FockDiag():
+    """
+    Eigensystem of a Hamiltonian matrix on a FockSpace, partitioned into invariant
+    subspaces. Provides the part of the AtomDiag interface used by the solver:
+    `energies` (relative to `gs_energy`), `n_subspaces`, `flatten_block_index`,
+    `c_connection`, `cdag_connection`, `c_matrix` and `cdag_matrix`.
+    """
+
+    def __init__(self, fock, H, label, n_subspaces):
+
+        self.fock = fock
+        self.fops = fock.fops
+        self.n_subspaces = n_subspaces
+
+        self.states, self.energies, self.vectors = [], [], []
+        for A in range(n_subspaces):
+            idx = np.nonzero(label == A)[0]
+            h = H[idx][:, idx].toarray()
+            if np.max(np.abs(h.imag), initial=0.0) == 0:
+                h = h.real
+            e, U = np.linalg.eigh(h)
+            self.states.append(idx)
+            self.energies.append(e)
+            self.vectors.append(U)
+
+        self.gs_energy = min(np.min(e) for e in self.energies if len(e) > 0)
+        self.energies = [e - self.gs_energy for e in self.energies]
+
+        # target subspace of c and c_dag of every orbital, -1 if the result vanishes
+        self._c_conn = -np.ones((len(self.fops), n_subspaces), dtype=int)
+        self._cdag_conn = -np.ones((len(self.fops), n_subspaces), dtype=int)
+        for i in range(len(self.fops)):
+            for conn, m in ((self._c_conn, fock.c[i]), (self._cdag_conn, fock.c_dag[i])):
+                m = m.tocoo()
+                valid = (label[m.row] >= 0) & (label[m.col] >= 0)
+                conn[i, label[m.col[valid]]] = label[m.row[valid]]
+
+    def flatten_block_index(self, block, i):
+        """Index of the operator (block, i) in fops."""
+        return self.fock.index[(block, i)]
+
+    def c_connection(self, op, B):
+        """Subspace that c(op) maps subspace B into, -1 if none."""
+        return int(self._c_conn[op, B])
+
+    def cdag_connection(self, op, A):
+        """Subspace that c_dag(op) maps subspace A into, -1 if none."""
+        return int(self._cdag_conn[op, A])
+
+    def _matrix(self, m, A, B):
+        block = m[self.states[A]][:, self.states[B]].toarray()
+        return self.vectors[A].conj().T @ block @ self.vectors[B]
+
+    def c_matrix(self, op, B):
+        """Matrix of c(op) from subspace B to c_connection(op, B) in the eigenbasis."""
+        return self._matrix(self.fock.c[op], self.c_connection(op, B), B)
+
+    def cdag_matrix(self, op, A):
+        """Matrix of c_dag(op) from subspace A to cdag_connection(op, A) in the eigenbasis."""
+        return self._matrix(self.fock.c_dag[op], self.cdag_connection(op, A), A)
+
+    def density_matrix(self, beta):
+        """Thermal density matrix in the eigenbasis, one diagonal matrix per subspace."""
+        weights = [np.exp(-beta*e) for e in self.energies]
+        Z = sum(np.sum(w) for w in weights)
+        return [np.diag(w/Z) for w in weights]
@@ -0,0 +1,398 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+from triqs.gf import *
+import numpy as np
+from scipy.special import ive
+
+# maximal number of (mesh point, pole) pairs evaluated at once
+_chunk_elements = 2**22
+
+def matsubara_freqs(beta, n_iw):
+    """The 2 n_iw fermionic Matsubara frequencies i w_n of a GfImFreq with n_points = n_iw."""
+    return 1j*(2*np.arange(-n_iw, n_iw) + 1)*np.pi/beta
+
+def real_freqs(window, n_w):
+    """The n_w real frequencies of a GfReFreq on window."""
+    return np.linspace(window[0], window[1], n_w)
+
+def _pole_sum(kernel, x, poles, residues):
+    """
+    Evaluate sum_p kernel(x, E_p) R^p_ab for all points x, in chunks of poles.
+    """
+
+    out = np.zeros((len(x),) + residues.shape[1:], dtype=complex)
+    chunk = max(1, _chunk_elements // max(len(x), 1))
+    for start in range(0, len(poles), chunk):
+        K = kernel(x[:, None], poles[None, start:start+chunk])
+        out += np.tensordot(K, residues[start:start+chunk], axes=(1, 0))
+    return out
+
+def distributed_map(fn, x, comm=None):
+    """
+    Evaluate fn on the points x, an array whose first axis runs over mesh points.
+    With an MPI communicator comm, every rank evaluates a contiguous slice of the
+    points and the slices are gathered, so that all ranks return the same result.
+    """
+
+    if comm is None or comm.Get_size() == 1:
+        return fn(x)
+    local = np.array_split(np.arange(len(x)), comm.Get_size())[comm.Get_rank()]
+    return np.concatenate(comm.allgather(fn(x[local])))
+
+def _kernel_tau(beta):
+    """Fermionic imaginary-time kernel -exp(-tau E)/(1 + exp(-beta E)), stable for both signs of E."""
+
+    def kernel(tau, E):
+        return np.where(E >= 0,
+                        -np.exp(-tau*np.abs(E))/(1 + np.exp(-beta*np.abs(E))),
+                        -np.exp(-(beta - tau)*np.abs(E))/(1 + np.exp(-beta*np.abs(E))))
+    return kernel
+
+def _kernel_legendre(beta):
+    """
+    Legendre kernel sqrt(2l+1) int_0^beta P_l(x(tau)) K(tau, E) dtau of the
+    imaginary-time kernel, i.e. -sqrt(2l+1) beta (-1)^l i_l(beta E/2)/(2 cosh(beta E/2))
+    with the modified spherical Bessel function i_l, in exponentially scaled form.
+    """
+
+    def kernel(l, E):
+        a = np.maximum(np.abs(0.5*beta*E), 1e-200)
+        f = np.sqrt(0.5*np.pi/a) * ive(l + 0.5, a) / (1 + np.exp(-2*a))
+        sign = np.where(E > 0, (-1.0)**l, 1.0)
+        return -np.sqrt(2*l + 1) * beta * sign * f
+    return kernel
+
+class AtomicLehmann():
+    """
+    Lehmann representation of the atomic Green's function
+
+    .. math:: G_{ab}(z) = \\sum_p \\frac{R^p_{ab}}{z - E_p},
+
+    stored for every block as an array of pole energies :math:`E_p` and an
+    array of residue matrices :math:`R^p`. Once extracted from the eigensystem,
+    the Green's function can be evaluated on any mesh without going through
+    the many-body states again.
+    """
+
+    def __init__(self, beta, gf_struct, poles, residues, discarded_weight=None, block_classes=None):
+        """
+        Parameters
+        ----------
+        beta : scalar
+               Inverse temperature of the thermal weights in the residues.
+        gf_struct : list of pairs [ (str,int), ...]
+                    Structure of the Green's functions.
+        poles : dict {block: np.array(n_poles)}
+                Pole energies per block.
+        residues : dict {block: np.array(n_poles, block_size, block_size)}
+                   Residue matrices per block.
+        discarded_weight : dict {block: float}, optional
+                   Upper bound of the residue weight dropped from each block.
+        block_classes : list of lists of str, optional
+                   Classes of equivalent blocks, which share their poles and residues and
+                   are evaluated only once. By default every block forms its own class.
+
+        """
+
+        self.beta = beta
+        self.gf_struct = gf_struct
+        self.poles = poles
+        self.residues = residues
+        if discarded_weight is None:
+            discarded_weight = {block: 0.0 for block, block_size in gf_struct}
+        self.discarded_weight = discarded_weight
+        if block_classes is None:
+            block_classes = [[block] for block, block_size in gf_struct]
+        self.block_classes = block_classes
+
+    @classmethod
+    def from_atom_diag(cls, ad, beta, gf_struct, threshold=0.0, merge_tol=1e-10, block_classes=None):
+        """
+        Extract the Lehmann representation from the eigensystem of an AtomDiag object.
+
+        Transitions between the states m and n contribute the pole
+        :math:`E_n - E_m` with residue
+        :math:`\\langle m|c_a|n\\rangle\\langle n|c^\\dagger_b|m\\rangle (e^{-\\beta E_m} + e^{-\\beta E_n})/Z`.
+        Transitions whose thermal weight times :math:`\\sum_a |\\langle m|c_a|n\\rangle|^2`
+        is below threshold are dropped, and poles closer than merge_tol are merged.
+
+        The sum of the dropped weights, plus twice the Boltzmann weight of all
+        states with a weight below threshold/2, whose transitions are not
+        enumerated, bounds the error of every element of the summed residues.
+        It is stored in `discarded_weight`.
+
+        Parameters
+        ----------
+        ad : AtomDiag
+             Diagonalized atomic problem.
+        beta : scalar
+               Inverse temperature.
+        gf_struct : list of pairs [ (str,int), ...]
+                    Structure of the Green's functions.
+        threshold : float, optional
+                    Minimal weight of the transitions that are kept.
+        merge_tol : float, optional
+                    Poles closer than merge_tol are merged into one.
+        block_classes : list of lists of str, optional
+                    Classes of equivalent blocks. Only the first block of every class
+                    is extracted, the others share its poles and residues.
+
+        """
+
+        energies = [np.asarray(e, dtype=float) for e in ad.energies]
+        e_gs = min(np.min(e) for e in energies if len(e) > 0)
+        weights = [np.exp(-beta*(e - e_gs)) for e in energies]
+        Z = sum(np.sum(w) for w in weights)
+        weights = [w/Z for w in weights]
+
+        # states whose transitions have to be enumerated
+        large = [(w >= 0.5*threshold) & (w > 0) for w in weights]
+        small_weight = sum(np.sum(w[~l]) for w, l in zip(weights, large))
+
+        if block_classes is None:
+            block_classes = [[block] for block, block_size in gf_struct]
+        sizes = dict(gf_struct)
+
+        poles, residues, discarded_weight = dict(), dict(), dict()
+        for block_class in block_classes:
+            block, block_size = block_class[0], sizes[block_class[0]]
+            ops = [ad.flatten_block_index(block, ii) for ii in range(block_size)]
+            p_list, r_list = [], []
+            discarded_weight[block] = 2*small_weight
+
+            for A in range(ad.n_subspaces):
+                # group the creation operators of the block by their target subspace
+                targets = dict()
+                for ii, op in enumerate(ops):
+                    B = ad.cdag_connection(op, A)
+                    if B != -1:
+                        targets.setdefault(B, []).append(ii)
+
+                for B, idx in targets.items():
+                    if not (np.any(large[A]) or np.any(large[B])):
+                        continue
+
+                    # C[a, m, n] = <m|c_a|n> for m in A, n in B
+                    C = np.zeros((block_size, len(energies[A]), len(energies[B])), dtype=complex)
+                    for ii in idx:
+                        C[ii] = ad.c_matrix(ops[ii], B)
+
+                    weight = weights[A][:, None] + weights[B][None, :]
+                    magnitude = weight * np.sum(np.abs(C)**2, axis=0)
+                    enumerated = large[A][:, None] | large[B][None, :]
+                    dropped = enumerated & (magnitude < threshold)
+                    discarded_weight[block] += np.sum(magnitude[dropped])
+
+                    m, n = np.nonzero(enumerated & ~dropped & (magnitude > 0))
+                    if len(m) == 0:
+                        continue
+
+                    Cmn = C[:, m, n].T
+                    p_list.append(energies[B][n] - energies[A][m])
+                    r_list.append(weight[m, n][:, None, None] * Cmn[:, :, None] * Cmn.conj()[:, None, :])
+
+            if p_list:
+                poles[block], residues[block] = _merge_poles(np.concatenate(p_list), np.concatenate(r_list), merge_tol)
+            else:
+                poles[block] = np.zeros(0)
+                residues[block] = np.zeros((0, block_size, block_size), dtype=complex)
+
+            for other in block_class[1:]:
+                poles[other], residues[other] = poles[block], residues[block]
+                discarded_weight[other] = discarded_weight[block]
+
+        return cls(beta, gf_struct, poles, residues, discarded_weight, block_classes)
+
+    @property
+    def n_poles(self):
+        """Number of poles per block."""
+        return {block: len(p) for block, p in self.poles.items()}
+
+    @property
+    def error_bound_iw(self):
+        """
+        Upper bound of the error of any element of G(iw) caused by the dropped
+        transitions, i.e. the discarded weight divided by the lowest Matsubara frequency.
+        """
+        return max(self.discarded_weight.values(), default=0.0) * self.beta/np.pi
+
+    def evaluate(self, block, kernel, x, comm=None):
+        """
+        Evaluate sum_p kernel(x, E_p) R^p for one block on the points x.
+        With an MPI communicator comm, the points are distributed over its ranks.
+
+        Returns
+        -------
+        data : np.array(len(x), block_size, block_size)
+
+        """
+        return distributed_map(lambda y: _pole_sum(kernel, y, self.poles[block], self.residues[block]),
+                               np.asarray(x), comm)
+
+    def _block_gf(self, make_gf, kernel, x, comm):
+        data = dict()
+        for block_class in self.block_classes:
+            data[block_class[0]] = self.evaluate(block_class[0], kernel, x, comm)
+            for other in block_class[1:]:
+                data[other] = data[block_class[0]]
+
+        name_list, g_list = [], []
+        for block, block_size in self.gf_struct:
+            g = make_gf(block_size)
+            g.data[:] = data[block]
+            name_list.append(block)
+            g_list.append(g)
+        return BlockGf(name_list = name_list, block_list = g_list)
+
+    def G_iw(self, n_iw, comm=None):
+        """Green's function on n_iw positive and negative fermionic Matsubara frequencies."""
+
+        iw = matsubara_freqs(self.beta, n_iw)
+        return self._block_gf(lambda size: GfImFreq(beta = self.beta, n_points = n_iw, target_shape = (size, size)),
+                              lambda z, E: 1/(z - E), iw, comm)
+
+    def G_w(self, window, n_w, idelta, comm=None):
+        """Green's function on n_w real frequencies in window, broadened by idelta."""
+
+        w = real_freqs(window, n_w) + 1j*idelta
+        return self._block_gf(lambda size: GfReFreq(window = window, n_points = n_w, target_shape = (size, size)),
+                              lambda z, E: 1/(z - E), w, comm)
+
+    def G_tau(self, n_tau, comm=None):
+        """Green's function on n_tau imaginary times between 0 and beta."""
+
+        tau = np.linspace(0, self.beta, n_tau)
+        return self._block_gf(lambda size: GfImTime(beta = self.beta, n_points = n_tau, target_shape = (size, size)),
+                              _kernel_tau(self.beta), tau, comm)
+
+    def G_l(self, n_l, comm=None):
+        """Green's function in the basis of the first n_l Legendre polynomials."""
+
+        return self._block_gf(lambda size: GfLegendre(beta = self.beta, n_points = n_l, target_shape = (size, size)),
+                              _kernel_legendre(self.beta), np.arange(n_l), comm)
+
+    def moment(self, k):
+        """
+        k-th moment sum_p R^p E_p^k of the spectral function, the coefficient of
+        1/z^(k+1) in the high-frequency expansion of G(z).
+
+        Returns
+        -------
+        moment : dict {block: np.array(block_size, block_size)}
+
+        """
+        return {block: np.tensordot(self.poles[block]**k, self.residues[block], axes=(0, 0))
+                for block, block_size in self.gf_struct}
+
+    def dlr_w_max(self):
+        """Frequency cutoff of a DLR basis for G and Sigma: twice the largest pole energy plus one."""
+        return 2*max((np.max(np.abs(p), initial=0.0) for p in self.poles.values()), default=0.0) + 1.0
+
+    def G_dlr_iw(self, w_max, eps, comm=None):
+        """Green's function on the Matsubara frequencies of a DLR basis with cutoff w_max and accuracy eps."""
+
+        mesh = MeshDLRImFreq(beta = self.beta, statistic = 'Fermion', w_max = w_max, eps = eps)
+        iw = np.array([complex(p.value) for p in mesh])
+        return self._block_gf(lambda size: Gf(mesh = mesh, target_shape = [size, size]),
+                              lambda z, E: 1/(z - E), iw, comm)
+
+    def peaks(self, weight_tol=1e-10):
+        """
+        Exact positions and spectral weights of the peaks of the atomic spectral function.
+
+        Returns
+        -------
+        peaks : dict {block: (np.array(n_peaks), np.array(n_peaks))}
+                Pole energies and the traces of their residues, for the poles
+                with a weight above weight_tol.
+
+        """
+
+        peaks = dict()
+        for block, block_size in self.gf_struct:
+            weights = np.real(np.trace(self.residues[block], axis1=1, axis2=2))
+            keep = weights > weight_tol
+            peaks[block] = (self.poles[block][keep], weights[keep])
+        return peaks
+
+    def adaptive_real_freqs(self, window, idelta, n_per_peak=81, width=300, n_background=101, weight_tol=1e-10):
+        """
+        Non-uniform real-frequency mesh that resolves the Lorentzian peaks of width idelta.
+
+        Around every pole in window with a weight above weight_tol, n_per_peak points
+        are placed within width*idelta of the pole, spaced as idelta*tan(x) for
+        uniformly spaced x, i.e. densest at the peak. They are combined with
+        n_background uniformly spaced points covering the window.
+
+        Returns
+        -------
+        w : np.array
+            Sorted frequencies, points closer than idelta/100 are merged.
+
+        """
+
+        w = [real_freqs(window, n_background)]
+        x = np.tan(np.linspace(-np.arctan(width), np.arctan(width), n_per_peak))
+        for block, (positions, weights) in self.peaks(weight_tol).items():
+            for E in positions[(positions >= window[0]) & (positions <= window[1])]:
+                w.append(E + idelta*x)
+
+        w = np.sort(np.concatenate(w))
+        w = w[(w >= window[0]) & (w <= window[1])]
+        return w[np.concatenate(([True], np.diff(w) > 0.01*idelta))]
+
+    def G_points(self, z, comm=None):
+        """
+        Green's function at arbitrary complex frequencies z, e.g. w + i*idelta on a non-uniform mesh.
+
+        Returns
+        -------
+        G : dict {block: np.array(len(z), block_size, block_size)}
+
+        """
+
+        G = dict()
+        for block_class in self.block_classes:
+            G[block_class[0]] = self.evaluate(block_class[0], lambda x, E: 1/(x - E), z, comm)
+            for other in block_class[1:]:
+                G[other] = G[block_class[0]]
+        return G
+
+    def __reduce_to_dict__(self):
+        return {'beta': self.beta, 'gf_struct': self.gf_struct, 'poles': self.poles,
+                'residues': self.residues, 'discarded_weight': self.discarded_weight,
+                'block_classes': self.block_classes}
+
+    @classmethod
+    def __factory_from_dict__(cls, name, D):
+        return cls(D['beta'], fix_gf_struct_type(D['gf_struct']), dict(D['poles']), dict(D['residues']),
+                   dict(D['discarded_weight']), [list(block_class) for block_class in D['block_classes']])
+
+def _merge_poles(poles, residues, tol):
+    """Sort the poles and merge the ones closer than tol, summing their residues."""
+
+    order = np.argsort(poles)
+    poles, residues = poles[order], residues[order]
+    start = np.concatenate(([0], np.nonzero(np.diff(poles) > tol)[0] + 1))
+    return poles[start], np.add.reduceat(residues, start, axis=0)
+
+from h5.formats import register_class
+register_class(AtomicLehmann)
@@ -0,0 +1,202 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+from concurrent.futures import ProcessPoolExecutor
+import time
+import triqs.utility.mpi as mpi
+from .solver import (Solver, _lehmann_task, _operator_terms, _negative_levels, _result_names, _stage,
+                     _check_params, _check_diagonalization_params, _mpi_initialized, _batch_params)
+
+# parameters of Solver.solve() that are applied in the process pool
+_pool_params = _batch_params + ['eal', 'equivalent_blocks', 'verbosity']
+
+class MultiImpuritySolver():
+    """
+    HubbardI solvers for several inequivalent correlated shells.
+
+    Holds one :class:`Solver` per shell and solves them concurrently: under MPI
+    the ranks are split into groups that solve different shells, without MPI the
+    diagonalizations can be run in a pool of worker processes.
+    """
+
+    def __init__(self, beta, gf_structs, **solver_params):
+        """
+        Initialise the solvers.
+
+        Parameters
+        ----------
+        beta : scalar
+               Inverse temperature.
+        gf_structs : list of gf_struct
+                     Structure of the Green's functions of every shell, see :class:`Solver`.
+        solver_params : dict {'param':value}
+                        Further parameters passed to all :class:`Solver` instances.
+
+        """
+
+        self.solvers = [Solver(beta, gf_struct, **solver_params) for gf_struct in gf_structs]
+
+    def __len__(self):
+        return len(self.solvers)
+
+    def __getitem__(self, ish):
+        return self.solvers[ish]
+
+    @property
+    def G0_iw(self):
+        """List of the non-interacting Green's functions of all shells."""
+        return [S.G0_iw for S in self.solvers]
+
+    @property
+    def G_iw(self):
+        """List of the Green's functions of all shells."""
+        return [S.G_iw for S in self.solvers]
+
+    @property
+    def Sigma_iw(self):
+        """List of the self energies of all shells, e.g. for ``SumkDFT.put_Sigma``."""
+        return [S.Sigma_iw for S in self.solvers]
+
+    def solve(self, h_int, n_workers=None, **params_kw):
+        """
+        Solve the impurity problems of all shells.
+
+        Under MPI the ranks are split into min(n_shells, n_ranks) groups, and each
+        group solves every n_groups-th shell. The results (Green's functions, self
+        energies, atomic levels and Lehmann representations) are then broadcast
+        to all ranks; `ad` is only kept by the group that solved the shell.
+        Without MPI and with `n_workers` > 1 the diagonalizations run in a pool of
+        worker processes and `ad` is not available. Worker processes are not forked
+        once MPI is initialized, e.g. under mpirun with a single rank; the shells
+        are then solved one after another.
+
+        Parameters
+        ----------
+        h_int : Operator or list of Operators
+                Local interaction of all shells, or one per shell.
+        n_workers : integer, optional
+                    Number of worker processes used without MPI. By default the shells
+                    are solved one after another.
+        params_kw : dict {'param':value}
+                    Parameters passed to :meth:`Solver.solve` of every shell. With
+                    `mpi_mode='distributed'` each shell is distributed over its group of ranks.
+                    In the process pool only `calc_*`, `n_min`, `n_max`, `energy_window`,
+                    `pole_threshold`, `eal`, `eal_fit`, `equivalent_blocks` and `verbosity`
+                    are supported, other parameters raise a ValueError.
+
+        """
+
+        if not isinstance(h_int, list):
+            h_int = [h_int]*len(self.solvers)
+        assert len(h_int) == len(self.solvers), 'one h_int per shell required'
+
+        if mpi.size > 1:
+            self._solve_mpi(h_int, params_kw)
+        elif n_workers is not None and n_workers > 1 and not _mpi_initialized():
+            self._solve_pool(h_int, n_workers, params_kw)
+        else:
+            if n_workers is not None and n_workers > 1:
+                self.solvers[0]._report(0, 'Warning: MPI is initialized, solving the shells without worker processes')
+            for S, h in zip(self.solvers, h_int):
+                S.solve(h_int=h, **params_kw)
+
+    def _solve_mpi(self, h_int, params_kw):
+        n_groups = min(len(self.solvers), mpi.size)
+        color = mpi.rank % n_groups
+        comm = mpi.world.Split(color, mpi.rank)
+
+        for ish, (S, h) in enumerate(zip(self.solvers, h_int)):
+            if ish % n_groups == color:
+                S.solve(h_int=h, **dict(params_kw, comm=comm))
+
+        # rank c is the lowest rank, hence the root, of group c
+        names = _result_names(params_kw.get('calc_gw', False), params_kw.get('calc_gtau', False),
+                              params_kw.get('calc_gl', False), params_kw.get('calc_dm', False))
+        names += ['eal', 'lehmann', 'particle_number_range']
+        for ish, S in enumerate(self.solvers):
+            root = ish % n_groups
+            for name in names:
+                val = mpi.world.bcast(getattr(S, name) if mpi.rank == root else None, root=root)
+                setattr(S, name, val)
+            if ish % n_groups != color:
+                S.ad = None
+
+        comm.Free()
+
+    def _solve_pool(self, h_int, n_workers, params_kw):
+        _check_params(params_kw, _pool_params, 'MultiImpuritySolver.solve with n_workers')
+        _check_diagonalization_params(params_kw.get('n_min', None), params_kw.get('n_max', None),
+                                      params_kw.get('energy_window', None), 'atom_diag')
+
+        verbosity = [S.verbosity for S in self.solvers]
+        for S in self.solvers:
+            S.verbosity = params_kw.get('verbosity', S.verbosity)
+        try:
+            self._solve_pool_tasks(h_int, n_workers, params_kw)
+        finally:
+            for S, v in zip(self.solvers, verbosity):
+                S.verbosity = v
+
+    def _solve_pool_tasks(self, h_int, n_workers, params_kw):
+        calc_gw = params_kw.get('calc_gw', False)
+        calc_gtau = params_kw.get('calc_gtau', False)
+        calc_gl = params_kw.get('calc_gl', False)
+        calc_dm = params_kw.get('calc_dm', False)
+        options = {'n_min': params_kw.get('n_min', None),
+                   'n_max': params_kw.get('n_max', None),
+                   'energy_window': params_kw.get('energy_window', None),
+                   'threshold': params_kw.get('pole_threshold', 0.0),
+                   'calc_dm': calc_dm}
+
+        tasks, starts = [], []
+        for S, h in zip(self.solvers, h_int):
+            starts.append(time.perf_counter())
+            stages = dict()
+            S.last_solve_stats = {'stages': stages, 'skipped': False}
+            S.last_solve_skipped = False
+            with _stage(stages, 'eal'):
+                S.eal, S.equivalent_blocks = S._atomic_levels(h, params_kw.get('eal', None),
+                                                              params_kw.get('equivalent_blocks', None),
+                                                              params_kw.get('eal_fit', 'fit_tail'))
+            with _stage(stages, 'H_loc'):
+                H_loc_terms = _operator_terms(S._H_loc(h, S.eal))
+            tasks.append((H_loc_terms, S.fops, S.gf_struct, S.beta,
+                          dict(options, n_start=_negative_levels(S.eal), block_classes=S.equivalent_blocks)))
+
+        self.solvers[0]._report(1, 'TRIQS: HubbardI solver, %d shells on %d worker processes'%(len(tasks), n_workers))
+        pool_stages = dict()
+        with _stage(pool_stages, 'diagonalization'):
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                solved = list(pool.map(_lehmann_task, *zip(*tasks)))
+
+        for S, start, (lehmann, dm, sizes) in zip(self.solvers, starts, solved):
+            stats = S.last_solve_stats
+            # the shells are diagonalized concurrently, each records the time of the whole pool
+            stats['stages'].update(pool_stages)
+            S.ad = None
+            S.lehmann = lehmann
+            for name, val in S._evaluate(lehmann, S.eal, calc_gw, calc_gtau, calc_gl, stages=stats['stages']).items():
+                setattr(S, name, val)
+            if calc_dm:
+                S.dm = dm
+            stats['hilbert_space_dim'] = sum(sizes)
+            stats['subspace_sizes'] = sorted(sizes, reverse=True)
+            stats['n_poles'] = dict(lehmann.n_poles)
+            S._finish_stats(start)
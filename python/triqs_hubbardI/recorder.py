@@ -0,0 +1,239 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+import atexit
+import hashlib
+import os
+import queue
+import threading
+import numpy as np
+from h5 import HDFArchive
+from triqs.gf import BlockGf
+import triqs.utility.mpi as mpi
+
+# held by ResultsRecorder while it writes in its background thread. The HDF5 library
+# is not thread-safe in general, so any other h5 access of a program that records
+# results has to take it as well, e.g. ``with h5_lock: ar = HDFArchive(...)``.
+h5_lock = threading.RLock()
+
+# files of the ResultsRecorder objects that are not closed yet
+_open_files = set()
+
+def _snapshot(val):
+    """Copy of val that is not affected by later changes of the original."""
+    if isinstance(val, BlockGf) or isinstance(val, np.ndarray):
+        return val.copy()
+    if isinstance(val, dict):
+        return {key: _snapshot(v) for key, v in val.items()}
+    if isinstance(val, list):
+        return [_snapshot(v) for v in val]
+    return val
+
+def _digest(val):
+    """Fingerprint of the content of val."""
+    h = hashlib.sha1()
+    if isinstance(val, BlockGf):
+        for name, g in val:
+            h.update(str(name).encode())
+            h.update(np.ascontiguousarray(g.data).tobytes())
+    elif isinstance(val, np.ndarray):
+        h.update(np.ascontiguousarray(val).tobytes())
+    else:
+        h.update(repr(val).encode())
+    return h.hexdigest()
+
+class ResultsRecorder():
+    """
+    Writes results to an h5 archive in a background thread.
+
+    :meth:`record` copies the values and queues them; the calling thread only
+    blocks if `max_queue` snapshots are already waiting to be written. Under MPI
+    only the master rank records, the other ranks return immediately. All queued
+    values are written by :meth:`flush`, :meth:`close`, at the end of a ``with``
+    block, and at interpreter exit.
+
+    Every write holds the module-level `h5_lock`, which other h5 reads and writes
+    in the same program must take as well. A file can only be used by one open
+    recorder, and should be read by other code only after :meth:`flush`.
+
+    Example
+    -------
+    >>> with ResultsRecorder('results.h5', 'DMFT_results/Iterations') as rec:
+    ...     for it in range(n_iter):
+    ...         S.solve(h_int=H, calc_gw=True)
+    ...         rec.record_solver(S, it)
+    ...         # next SumK step, overlapping with the write
+    """
+
+    def __init__(self, filename, group='', max_queue=2, only_changed=False):
+        """
+        Parameters
+        ----------
+        filename : str
+                   Name of the h5 file, opened in append mode for every write. It must not be
+                   used by another open recorder.
+        group : str, optional
+                Path of the group the values are written to, e.g. 'DMFT_results/Iterations'.
+        max_queue : integer, optional
+                    Maximal number of snapshots waiting to be written.
+        only_changed : bool, optional
+                       Do not write values again that are identical to the last value recorded for
+                       the same field. Their key then holds a str, the path of that earlier value
+                       in the archive, so that every key recorded is present in the file.
+
+        """
+
+        self.filename = filename
+        self.group = group.strip('/')
+        self.only_changed = only_changed
+        self.active = mpi.is_master_node()
+
+        self._last = dict()
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        if self.active:
+            self._path = os.path.abspath(filename)
+            with h5_lock:
+                if self._path in _open_files:
+                    raise ValueError('%s is already used by another open ResultsRecorder'%filename)
+                _open_files.add(self._path)
+            self._thread = threading.Thread(target=self._work, name='ResultsRecorder', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is not None and self._error is None:
+                    self._write(*item)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+            if item is None:
+                return
+
+    def _write(self, group, values):
+        with h5_lock, HDFArchive(self.filename, 'a') as ar:
+            grp = ar
+            for part in [p for p in group.split('/') if p]:
+                if part not in grp:
+                    grp.create_group(part)
+                grp = grp[part]
+            for key, val in values.items():
+                grp[key] = val
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError('ResultsRecorder failed to write to %s'%self.filename) from error
+
+    def record(self, values, group=None, fields=None):
+        """
+        Queue values for writing.
+
+        Parameters
+        ----------
+        values : dict {key: object}
+                 Objects to write under their keys. They are copied before this call returns.
+        group : str, optional
+                Subgroup of the recorder's group to write to.
+        fields : dict {key: str}, optional
+                 Name of the field a key belongs to, for `only_changed`. By default the key itself.
+
+        Returns
+        -------
+        written : list of str
+                  The keys whose values were queued, without the unchanged ones, which
+                  are written as references with `only_changed`.
+
+        """
+
+        if not self.active:
+            return []
+        self._check()
+        if self._thread is None:
+            raise RuntimeError('ResultsRecorder is closed')
+
+        path = '/'.join(p for p in [self.group, (group or '').strip('/')] if p)
+        snapshot, written = dict(), []
+        for key, val in values.items():
+            if self.only_changed:
+                field = key if fields is None else fields.get(key, key)
+                digest = _digest(val)
+                last = self._last.get(field)
+                if last is not None and last[0] == digest:
+                    snapshot[key] = last[1]
+                    continue
+                self._last[field] = (digest, '/' + '/'.join(p for p in [path, key] if p))
+            snapshot[key] = _snapshot(val)
+            written.append(key)
+
+        if snapshot:
+            self._queue.put((path, snapshot))
+        return written
+
+    def record_solver(self, S, iteration, names=('G0_iw', 'G_iw', 'Sigma_iw', 'G_w', 'Sigma_w'), group=None):
+        """
+        Queue Green's functions of a Solver, written as '<name>_it<iteration>'.
+        Real-frequency and other lazily allocated results are only recorded if
+        they have been computed.
+
+        Returns
+        -------
+        written : list of str
+                  The keys whose values were queued, see :meth:`record`.
+
+        """
+
+        values, fields = dict(), dict()
+        for name in names:
+            if name in ['G_w', 'Sigma_w', 'G0_w', 'G_tau', 'G_l'] and name not in S.__dict__:
+                continue
+            key = '%s_it%s'%(name, iteration)
+            values[key] = getattr(S, name)
+            fields[key] = name
+        return self.record(values, group, fields)
+
+    def flush(self):
+        """Wait until all queued values are written."""
+        if self.active:
+            self._queue.join()
+            self._check()
+
+    def close(self):
+        """Write all queued values and stop the background thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        with h5_lock:
+            _open_files.discard(self._path)
+        atexit.unregister(self.close)
+        self._check()
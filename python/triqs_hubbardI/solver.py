@@ -21,14 +21,420 @@
 from triqs.gf import *
 from triqs.atom_diag import *
 from itertools import *
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import hashlib
+import os
+import sys
+import time
+import tracemalloc
 import numpy as np
 from triqs.operators import Operator, c, c_dag, n
 import triqs.utility.mpi as mpi
+from h5 import HDFArchive
+from .lehmann import AtomicLehmann, matsubara_freqs, real_freqs, distributed_map
+from .fock import FockSpace, FockDiag
+from .symmetry import detect_quantum_numbers, equivalent_blocks as find_equivalent_blocks
+from .recorder import h5_lock
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def _peak_rss_mb():
+    """Peak resident set size of the process in MB, None where it is not available."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss/2**20 if sys.platform == 'darwin' else rss/2**10
+
+def _rss_mb():
+    """Current resident set size of the process in MB, None where it is not available (only on Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1])*os.sysconf('SC_PAGE_SIZE')/2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _difference(after, before):
+    return None if after is None or before is None else after - before
+
+@contextmanager
+def _stage(stages, name):
+    """
+    Record in stages[name] the wall time of the enclosed stage and the memory it
+    used: the change of the resident set size, `rss_delta_mb`, and by how much it
+    raised the peak resident set size of the process, `peak_increase_mb`. If
+    tracemalloc is tracing, also the peak of the Python and numpy allocations made
+    during the stage, `traced_peak_mb`.
+    """
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        traced_start = tracemalloc.get_traced_memory()[0]
+    rss, peak = _rss_mb(), _peak_rss_mb()
+    start = time.perf_counter()
+    yield
+    stages[name] = {'time': time.perf_counter() - start,
+                    'rss_delta_mb': _difference(_rss_mb(), rss),
+                    'peak_increase_mb': _difference(_peak_rss_mb(), peak)}
+    if tracing:
+        stages[name]['traced_peak_mb'] = (tracemalloc.get_traced_memory()[1] - traced_start)/2**20
+
+# fields written to h5 archives by the storage policies of Solver.h5_storage
+_storage_policies = {
+    'full': {'G0_iw', 'G_iw', 'Sigma_iw', 'G0_w', 'G_w', 'Sigma_w', 'G_tau', 'G_l', 'G_dlr', 'Sigma_dlr', 'Sigma_dlr_inf', 'ad'},
+    'no_ad': {'G0_iw', 'G_iw', 'Sigma_iw', 'G0_w', 'G_w', 'Sigma_w', 'G_tau', 'G_l', 'G_dlr', 'Sigma_dlr', 'Sigma_dlr_inf'},
+    'results': {'G_iw', 'Sigma_iw', 'G_w', 'Sigma_w', 'G_tau', 'G_l', 'G_dlr', 'Sigma_dlr', 'Sigma_dlr_inf'},
+    'lehmann': {'G0_iw', 'lehmann'},
+    'dlr': {'G_dlr', 'Sigma_dlr', 'Sigma_dlr_inf'},
+}
+
+def _without_none(stats):
+    """Copy of a nested stats dict without the None entries, which h5 cannot store."""
+    return {key: _without_none(val) if isinstance(val, dict) else val
+            for key, val in stats.items() if val is not None}
+
+def _H_loc_summary(H_loc, eal, n_orb):
+    """One-line summary of the local Hamiltonian: number of terms, Hilbert-space dimension and level diagonal."""
+    levels = ', '.join('%s: [%s]'%(block, ' '.join('%.4f'%e for e in np.real(np.diag(val)))) for block, val in eal.items())
+    return '%d terms, Hilbert space dimension %d, atomic levels %s'%(sum(1 for term in H_loc), 2**n_orb, levels)
+
+def _copy_result(val):
+    """Copy of a solver result (Green's function or list of density matrices)."""
+    if isinstance(val, list):
+        return [np.copy(x) for x in val]
+    return val.copy()
+
+def _operator_terms(op):
+    """Canonical, sorted list of the (monomial, coefficient) terms of an Operator."""
+    terms = []
+    for monomial, coef in op:
+        monomial = tuple((bool(dagger), tuple(indices)) for dagger, indices in monomial)
+        terms.append((monomial, complex(coef)))
+    return sorted(terms, key=repr)
+
+def _operator_hash(op, fops):
+    """Hash of an Operator and the fundamental operator set it acts on."""
+    key = repr((_operator_terms(op), [tuple(f) for f in fops]))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def _inverse_data(data):
+    """Inverse of the matrices data[i], batched over the first axis."""
+    if data.shape[1] == 1:
+        return 1/data
+    return np.linalg.inv(data)
+
+def _self_energy_data(g_data, z, eal_block, comm=None):
+    """Self energy z - eal - g(z)^{-1} of one block, given as the array g_data[i] = g(z[i])."""
+    identity = np.eye(g_data.shape[1])
+    sigma = lambda i: z[i,None,None]*identity - eal_block - _inverse_data(g_data[i])
+    return distributed_map(sigma, np.arange(len(z)), comm)
+
+def _self_energy(G, z, eal, comm=None, block_classes=None):
+    """
+    Self energy z - eal - G(z)^{-1} of the block Green's function G on the
+    mesh points z, inverting all frequencies of a block at once, or, with an
+    MPI communicator comm, the frequencies of each rank. With block_classes,
+    only the first block of every class is inverted and copied to the others.
+    """
+
+    if block_classes is None:
+        block_classes = [[block] for block, g in G]
+
+    Sigma = G.copy()
+    for block_class in block_classes:
+        block = block_class[0]
+        Sigma[block].data[:] = _self_energy_data(G[block].data, z, eal[block], comm)
+        for other in block_class[1:]:
+            Sigma[other].data[:] = Sigma[block].data
+    return Sigma
+
+def _tail_moments(lehmann, eal, n_moments=4):
+    """
+    High-frequency moments of G and Sigma from the moments M_k = sum_p R^p E_p^k of
+    the Lehmann representation, which are the thermal averages of the anticommutators
+    of c_dag with the k-fold commutators [H_loc, c]. In the TRIQS convention
+    G(iw) = sum_k G_k/(iw)^k with G_0 = 0 and G_k = M_{k-1}, and
+    Sigma(iw) = Sigma_0 + Sigma_1/iw + ... with Sigma_0 = M_0^-1 M_1 M_0^-1 - eal and
+    Sigma_1 = (M_0^-1 M_2 - M_0^-1 M_1 M_0^-1 M_1) M_0^-1, where M_0 is the unit matrix
+    up to the weight of discarded poles.
+
+    Returns
+    -------
+    G_moments, Sigma_moments : dicts {block: np.array(n, block_size, block_size)}
+                               n_moments + 1 moments of G and the two moments of Sigma.
+
+    """
+
+    M = [lehmann.moment(k) for k in range(max(n_moments, 3))]
+    G_moments, Sigma_moments = dict(), dict()
+    for block, block_size in lehmann.gf_struct:
+        G_moments[block] = np.array([np.zeros((block_size, block_size), dtype=complex)]
+                                    + [M[k][block] for k in range(n_moments)], dtype=complex)
+        M0_inv = np.linalg.inv(M[0][block])
+        A = M0_inv @ M[1][block]
+        Sigma_moments[block] = np.array([A @ M0_inv - eal[block],
+                                         (M0_inv @ M[2][block] - A @ A) @ M0_inv], dtype=complex)
+    return G_moments, Sigma_moments
+
+def _tail_constants(G0_data, beta, n_moments=4, tail_fraction=0.3):
+    """
+    Constant term of the high-frequency expansion of iw - G0(iw)^{-1}, the atomic
+    levels, for a dict {block: G0 data} on the same Matsubara mesh.
+
+    Only the highest tail_fraction of the positive and negative frequencies are
+    inverted. The expansion a_0 + a_1/iw + ... + a_{n_moments-1}/(iw)^{n_moments-1}
+    is fitted to all elements of all blocks in a single least-squares solve.
+    """
+
+    n_iw = next(iter(G0_data.values())).shape[0]//2
+    n_tail = min(n_iw, max(2*n_moments, int(tail_fraction*n_iw)))
+    idx = np.concatenate((np.arange(n_tail), np.arange(2*n_iw - n_tail, 2*n_iw)))
+    z = matsubara_freqs(beta, n_iw)[idx]
+
+    columns = []
+    for block, data in G0_data.items():
+        identity = np.eye(data.shape[1])
+        Delta = z[:,None,None]*identity - _inverse_data(data[idx])
+        columns.append(Delta.reshape(len(z), -1))
+
+    V = z[:,None]**(-np.arange(n_moments))[None,:]
+    a, residuals, rank, sv = np.linalg.lstsq(V, np.hstack(columns), rcond=None)
+
+    eal, start = dict(), 0
+    for block, data in G0_data.items():
+        size = data.shape[1]
+        eal[block] = a[0, start:start+size*size].reshape(size, size)
+        start += size*size
+    return eal
+
+def _check_diagonalization_params(n_min, n_max, energy_window, backend):
+    """Raise ValueError for inconsistent truncation parameters or an unknown backend."""
+    if energy_window is not None and (n_min is not None or n_max is not None):
+        raise ValueError('energy_window cannot be combined with n_min/n_max')
+    if backend not in ['atom_diag', 'fock']:
+        raise ValueError('Unknown backend %s'%backend)
+
+def _result_names(calc_gw, calc_gtau, calc_gl, calc_dm):
+    """Names of the solver attributes computed by a solve with the given flags."""
+    results = ['G_iw', 'Sigma_iw']
+    if calc_gw: results += ['G_w', 'Sigma_w']
+    if calc_gtau: results.append('G_tau')
+    if calc_gl: results.append('G_l')
+    if calc_dm: results.append('dm')
+    return results
+
+def _negative_levels(eal):
+    """Number of negative eigenvalues of the atomic levels, the filling of the non-interacting atom."""
+    return sum(int(np.sum(np.linalg.eigvalsh(0.5*(e + e.conj().T)) < 0)) for e in eal.values())
+
+def _particle_number_range(H_loc, fops, energy_window, n_start, gs_energy=None):
+    """
+    Particle-number range (n_min, n_max) of the sectors within energy_window
+    above the ground state, padded by one sector on each side.
+
+    The lowest energy of single sectors is obtained by diagonalizing them one
+    by one, with AtomDiag or the function gs_energy(n), starting from n_start,
+    which is either a particle number or the range (n_min, n_max) of a previous solve.
+    """
+
+    n_orb = len(fops)
+    if gs_energy is None:
+        gs_energy = lambda n: AtomDiag(H_loc, fops, n, n).gs_energy
+    sector_energy = dict()
+    def e_min(n):
+        if n not in sector_energy:
+            sector_energy[n] = gs_energy(n)
+        return sector_energy[n]
+
+    if isinstance(n_start, tuple):
+        n_gs = (n_start[0] + n_start[1] + 1)//2
+    else:
+        n_gs = min(max(n_start, 0), n_orb)
+
+    # walk downhill to the sector containing the ground state
+    while n_gs > 0 and e_min(n_gs-1) < e_min(n_gs):
+        n_gs -= 1
+    while n_gs < n_orb and e_min(n_gs+1) < e_min(n_gs):
+        n_gs += 1
+
+    n_lo, n_hi = n_gs, n_gs
+    while n_lo > 0 and e_min(n_lo-1) - e_min(n_gs) <= energy_window:
+        n_lo -= 1
+    while n_hi < n_orb and e_min(n_hi+1) - e_min(n_gs) <= energy_window:
+        n_hi += 1
+
+    return max(n_lo-1, 0), min(n_hi+1, n_orb)
+
+def _sector_energies(ad):
+    """Lowest energy of every particle-number sector of an AtomDiag or FockDiag object."""
+
+    if isinstance(ad, FockDiag):
+        n_particles = [ad.fock.n_particles[states[0]] for states in ad.states]
+    else:
+        n_particles = [bin(int(states[0])).count('1') for states in ad.fock_states]
+
+    sector_energy = dict()
+    for n, e in zip(n_particles, ad.energies):
+        if len(e) > 0:
+            sector_energy[n] = min(sector_energy.get(n, np.inf), np.min(e))
+    return sector_energy
+
+def _brackets_window(ad, n_min, n_max, n_orb, energy_window):
+    """
+    Whether the diagonalization ad of the sectors n_min to n_max contains all sectors
+    within energy_window above the ground state, padded by one sector on each side,
+    i.e. whether n_min and n_max are at the bounds of the Fock space or outside the window.
+    """
+
+    sector_energy = _sector_energies(ad)
+    e_gs = min(sector_energy.values())
+    return ((n_min == 0 or sector_energy[n_min] - e_gs > energy_window)
+            and (n_max == n_orb or sector_energy[n_max] - e_gs > energy_window))
+
+def _density_matrix(ad, beta):
+    """Atomic density matrix of an AtomDiag or FockDiag object."""
+    if isinstance(ad, FockDiag):
+        return ad.density_matrix(beta)
+    return atomic_density_matrix(ad, beta)
+
+def _operator_from_terms(terms):
+    """Operator from a list of (monomial, coefficient) terms as returned by _operator_terms."""
+    op = Operator()
+    for monomial, coef in terms:
+        term = coef.real if coef.imag == 0 else coef
+        for dagger, indices in monomial:
+            term = term * (c_dag(*indices) if dagger else c(*indices))
+        op += term
+    return op
+
+def _mpi_initialized():
+    """Whether MPI is initialized in this process, e.g. by triqs.utility.mpi under mpirun, even on a single rank."""
+    MPI = sys.modules.get('mpi4py.MPI')
+    return MPI is not None and MPI.Is_initialized()
+
+def _check_params(params_kw, supported, method):
+    """Raise ValueError for parameters that method does not support instead of ignoring them."""
+    unsupported = sorted(set(params_kw) - set(supported))
+    if unsupported:
+        raise ValueError('%s does not support the parameters %s'%(method, ', '.join(unsupported)))
+
+# parameters of solve() that are applied by solve_batch
+_batch_params = ['calc_gw', 'calc_gtau', 'calc_gl', 'calc_dm', 'n_min', 'n_max', 'energy_window',
+                 'pole_threshold', 'eal_fit']
+
+# parameters of solve() that are applied by solve_temperatures
+_temperature_params = ['h_int', 'calc_gw', 'calc_gtau', 'calc_gl', 'calc_dm', 'n_min', 'n_max', 'energy_window',
+                       'pole_threshold', 'eal', 'eal_fit', 'quantum_numbers', 'backend']
+
+def _lehmann_task(H_loc_terms, fops, gf_struct, beta, options):
+    """
+    Diagonalize one local Hamiltonian, given by its terms, and return its Lehmann
+    representation, its density matrix if options['calc_dm'] (None otherwise) and
+    the sizes of its subspaces. Used by Solver.solve_batch and MultiImpuritySolver,
+    also in worker processes.
+    """
+
+    H_loc = _operator_from_terms(H_loc_terms)
+    n_min, n_max = options['n_min'], options['n_max']
+    if options['energy_window'] is not None:
+        n_min, n_max = _particle_number_range(H_loc, fops, options['energy_window'], options['n_start'])
+    if n_min is None and n_max is None:
+        ad = AtomDiag(H_loc, fops)
+    else:
+        ad = AtomDiag(H_loc, fops, 0 if n_min is None else n_min, len(fops) if n_max is None else n_max)
+
+    lehmann = AtomicLehmann.from_atom_diag(ad, beta, gf_struct, threshold=options['threshold'],
+                                           block_classes=options.get('block_classes', None))
+    dm = _density_matrix(ad, beta) if options['calc_dm'] else None
+    return lehmann, dm, [len(e) for e in ad.energies]
+
+def _archive_group(ar, key):
+    """Subgroup key, a path like 'dmft/it_5/Solver', of an HDFArchive without reconstructing objects."""
+    group = ar
+    for part in key.strip('/').split('/'):
+        group = group.get_raw(part)
+    return group
+
+class _LazyBlockGf():
+    """
+    Block Green's function attribute of the Solver that is only allocated
+    (with zeros) when it is first accessed, unless it was assigned before.
+    For a Solver restored lazily with Solver.from_archive, it is read from the archive instead.
+    """
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self.name not in instance.__dict__:
+            if instance._in_archive(self.name):
+                instance.__dict__[self.name] = instance._read_archive_field(self.name)
+            else:
+                instance.__dict__[self.name] = instance._make_block_gf(self.mesh)
+        return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+class _ArchiveField():
+    """
+    Attribute of the Solver that, for a Solver restored lazily with Solver.from_archive,
+    is read from the archive when it is first accessed.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self.name not in instance.__dict__:
+            if not instance._in_archive(self.name):
+                raise AttributeError(self.name)
+            instance.__dict__[self.name] = instance._read_archive_field(self.name)
+        return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
 
 class Solver():
-    """Class providing initialization and solve function. Contains all relevant Greensfunctions and self energy."""
+    """
+    Class providing initialization and solve function. Contains all relevant Greensfunctions and self energy.
+
+    The attribute `h5_storage` chooses what is written to h5 archives:
+
+    * 'full' (default): all allocated Green's functions and `ad`.
+    * 'no_ad': all allocated Green's functions.
+    * 'results': G, Sigma and the atomic levels.
+    * 'lehmann': G0_iw and the poles and residues of `lehmann`, from which the results are evaluated when reading.
+    * 'dlr': the DLR results of a solve with calc_dlr=True.
+    * a list of field names: exactly these fields.
+    """
+
+    # Green's functions are allocated on first access or when they are computed in solve()
+    G0_iw = _LazyBlockGf('iw')
+    G_iw = _LazyBlockGf('iw')
+    Sigma_iw = _LazyBlockGf('iw')
+    G0_w = _LazyBlockGf('w')
+    G_w = _LazyBlockGf('w')
+    Sigma_w = _LazyBlockGf('w')
+    G_tau = _LazyBlockGf('tau')
+    G_l = _LazyBlockGf('l')
+    ad = _ArchiveField()
+    lehmann = _ArchiveField()
 
-    def __init__(self, beta, gf_struct, n_iw=1025, n_tau=10001, n_l=30, n_w=500,w_min=-15,w_max=15,idelta=0.01):
+    def __init__(self, beta, gf_struct, n_iw=1025, n_tau=10001, n_l=30, n_w=500,w_min=-15,w_max=15,idelta=0.01,ad_cache_size=1,verbosity=2):
         """
 
         Initialise the solver.
@@ -56,40 +462,19 @@ class Solver():
                 Upper limit of the range of real frequencies
         idelta : float, optional
                 Broadening of Green's function on real frequencies
+        ad_cache_size : integer, optional
+                Maximal number of AtomDiag objects kept in the in-process cache.
+                A solve with a local Hamiltonian identical to a cached one skips
+                the diagonalization. Set to 0 to disable the cache.
+        verbosity : integer, optional
+                Output on the master rank: 0 only warnings, 1 a summary of every step
+                with a one-line description of the local Hamiltonian, 2 additionally
+                the full local Hamiltonian. Messages are only formatted when printed.
 
         """
 
         gf_struct = fix_gf_struct_type(gf_struct)
 
-        g_w_list = []
-        g_iw_list = []
-        g_tau_list = []
-        g_l_list = []
-
-        name_list = [block for block, block_size in gf_struct]
-        for block, block_size in gf_struct:
-            g_w_list.append(GfReFreq(window = (w_min, w_max), n_points = n_w, target_shape = (block_size, block_size)))
-            g_iw_list.append(GfImFreq(beta = beta, n_points = n_iw, target_shape = (block_size, block_size)))
-            g_tau_list.append(GfImTime(beta = beta, n_points = n_tau, target_shape = (block_size, block_size)))
-            g_l_list.append(GfLegendre(beta = beta, n_points = n_l, target_shape = (block_size, block_size)))
-
-        self.G0_w = BlockGf(name_list = name_list, block_list = g_w_list)
-        self.G0_iw = BlockGf(name_list = name_list, block_list = g_iw_list)
-        self.G_tau = BlockGf(name_list = name_list, block_list = g_tau_list)
-        self.G_l = BlockGf(name_list = name_list, block_list = g_l_list)
-
-        self.Sigma_iw = self.G0_iw.copy()
-        self.Sigma_iw.zero()
-
-        self.G_iw = self.G0_iw.copy()
-        self.G_iw.zero()
-
-        self.Sigma_w = self.G0_w.copy()
-        self.Sigma_w.zero()
-
-        self.G_w = self.G0_w.copy()
-        self.G_w.zero()
-
         self.gf_struct = gf_struct
 
         self.n_iw = n_iw
@@ -111,10 +496,75 @@ class Solver():
         for block, block_size in self.gf_struct:
             self.eal[block]= np.zeros((block_size,block_size))
 
+        # one-body operators c_dag(block,ii)*c(block,jj) of the atomic levels
+        self._bilinears = {block: [[c_dag(block,ii)*c(block,jj) for jj in range(block_size)]
+                                   for ii in range(block_size)]
+                           for block, block_size in self.gf_struct}
+
+        self.ad_cache_size = ad_cache_size
+        self.verbosity = verbosity
+        self._ad_cache = OrderedDict()
+        self._fock = None
+        self._h_int_matrix = None
+        self._h5_source = None
+        self._ad_cache_hits = 0
+        self._ad_cache_misses = 0
+
+        self.last_solve_skipped = False
+        self.last_solve_stats = None
+        self.store_solve_stats = False
+        self.h5_storage = 'full'
+        self.reset_solve_stats()
+        self._converged_state = None
+        self.particle_number_range = None
+        self.quantum_numbers = None
+        self.equivalent_blocks = None
+        self.lehmann = None
+        self.G_dlr = None
+        self.Sigma_dlr = None
+        self.Sigma_dlr_inf = None
+
+    def _report(self, level, message):
+        """Report message, a string or a function returning it, on the master rank if verbosity >= level."""
+        if self.verbosity >= level and mpi.is_master_node():
+            mpi.report(message() if callable(message) else message)
+
+    def _make_block_gf(self, mesh):
+        """Zero block Green's function on the 'iw', 'w', 'tau' or 'l' mesh of the solver."""
+
+        g_list = []
+        for block, block_size in self.gf_struct:
+            if mesh == 'iw':
+                g = GfImFreq(beta = self.beta, n_points = self.n_iw, target_shape = (block_size, block_size))
+            elif mesh == 'w':
+                g = GfReFreq(window = (self.w_min, self.w_max), n_points = self.n_w, target_shape = (block_size, block_size))
+            elif mesh == 'tau':
+                g = GfImTime(beta = self.beta, n_points = self.n_tau, target_shape = (block_size, block_size))
+            elif mesh == 'l':
+                g = GfLegendre(beta = self.beta, n_points = self.n_l, target_shape = (block_size, block_size))
+            else:
+                raise ValueError('Unknown mesh %s'%mesh)
+            g.zero()
+            g_list.append(g)
+
+        return BlockGf(name_list = [block for block, block_size in self.gf_struct], block_list = g_list)
+
     def solve(self, **params_kw):
         """
         Solve the impurity problem: calculate G(iw) and Sigma(iw)
 
+        The atomic Green's function is extracted once as a table of poles and
+        residues, stored in `lehmann` (:class:`AtomicLehmann`), from which it can
+        be evaluated on further meshes, e.g. ``S.lehmann.G_iw(n_iw)``.
+
+        The wall time of every stage, the Hilbert-space and subspace sizes, the number
+        of poles and the peak memory of the process are stored in `last_solve_stats`
+        and summed over all solves in `cumulative_solve_stats`. With
+        `store_solve_stats` set to True, both are written to h5 archives. The memory
+        attributed to a stage is the change of the resident set size and the increase
+        of the peak resident set size during the stage, and, if ``tracemalloc`` is
+        tracing, the peak of the Python and numpy allocations made in the stage.
+
         Parameters
         ----------
         params_kw : dict {'param':value} that is passed to the core solver.
@@ -125,10 +575,72 @@ class Solver():
                         * `calc_gw` (bool): calculate G(w) and Sigma(w)
                         * `calc_gl` (bool): calculate G(legendre)
                         * `calc_dm` (bool): calculate density matrix
+                        * `eal` (dict {block: matrix}): the atomic levels. If given, they are used
+                          directly and `G0_iw` is neither inverted nor fitted.
+                        * `eal_fit` (str): how the atomic levels are extracted from `G0_iw`,
+                          'fit_tail' (default) fits the tail of every block with TRIQS,
+                          'lstsq' determines the constants of all blocks in a single
+                          least-squares fit of the highest frequencies.
+                        * `eal_tol` (float): if given, skip the solution and keep the previous
+                          results when the atomic levels deviate by less than `eal_tol` from
+                          the ones of the previous solve with the same `h_int`. Whether the
+                          last call was skipped is stored in `last_solve_skipped`.
+                        * `n_min`, `n_max` (int): restrict the diagonalization to the Fock states with
+                          `n_min` to `n_max` particles. The range has to contain the particle numbers
+                          of all thermally occupied states plus/minus one.
+                        * `energy_window` (float): choose `n_min` and `n_max` automatically such that all
+                          particle-number sectors with a lowest energy of less than `energy_window`
+                          above the ground state, plus their neighbouring sectors, are kept.
+                          Assumes that the sector ground-state energy is convex in the particle number.
+                          The range of the previous solve is kept if it still contains the window.
+                        * `quantum_numbers` ('auto' or list of Operators): partition the Hilbert space
+                          by the given conserved quantities instead of the automatic partitioning of
+                          AtomDiag. 'auto' uses the standard quantities (N, per-block N, Sz, Jz) that
+                          commute with the local Hamiltonian, their names are stored in `quantum_numbers`.
+                          Ignored for a restricted particle-number range.
+                        * `equivalent_blocks` ('auto' or list of lists of block names): classes of
+                          equivalent blocks, e.g. ``[['up', 'down']]`` in the paramagnetic case. Only the
+                          first block of every class is fitted, extracted, evaluated and inverted, the
+                          results are copied to the other blocks. 'auto' finds the blocks with the same
+                          atomic levels that are exchanged by a symmetry of `h_int`, and averages their
+                          levels. The classes used are stored in `equivalent_blocks`.
+                        * `backend` (str): 'atom_diag' (default) diagonalizes the local Hamiltonian with
+                          TRIQS AtomDiag. 'fock' builds the sparse Fock-space matrix of `h_int` once,
+                          adds the one-body matrix of the atomic levels on every solve and diagonalizes
+                          its invariant subspaces with numpy. `ad` is then a :class:`FockDiag`, which is
+                          not stored in h5 archives.
+                        * `pole_threshold` (float): drop the transitions whose thermal weight times
+                          squared matrix element is below `pole_threshold` from the Lehmann
+                          representation. The number of kept poles and an upper bound of the
+                          resulting error of G(iw) are reported.
+                        * `mpi_mode` (str): 'redundant' (default) solves the full problem on every rank.
+                          'distributed' diagonalizes on the master rank only, broadcasts the Lehmann
+                          representation and distributes the mesh points of all Green's functions and
+                          self energies over the ranks. The results are identical on all ranks, `ad`
+                          is only available on the master rank.
+                        * `comm` (MPI communicator): communicator of the 'distributed' mode, defaults
+                          to `mpi.world`.
+                        * `verbosity` (int): verbosity of this solve, see :class:`Solver`.
+                        * `calc_dlr` (bool): calculate G and Sigma in a discrete Lehmann representation,
+                          `G_dlr` and `Sigma_dlr`, from the atomic poles. Sigma_dlr is the self energy
+                          minus its constant part `Sigma_dlr_inf`. Use :meth:`dlr_to_mesh` to evaluate
+                          them on a dense Matsubara or imaginary-time mesh.
+                        * `dlr_eps` (float): accuracy of the DLR basis, default 1e-10.
+                        * `dlr_w_max` (float): frequency cutoff of the DLR basis, by default twice the
+                          largest pole energy plus one.
 
         """
 
-        mpi.report('TRIQS: HubbardI solver')
+        verbosity = self.verbosity
+        self.verbosity = params_kw.get('verbosity', verbosity)
+        try:
+            self._solve(**params_kw)
+        finally:
+            self.verbosity = verbosity
+
+    def _solve(self, **params_kw):
+
+        self._report(1, 'TRIQS: HubbardI solver')
 
 
         h_int = params_kw['h_int']
@@ -152,93 +664,823 @@ class Solver():
         except KeyError:
             calc_dm = False
 
-        Delta_iw = 0*self.G0_iw
-        Delta_iw << iOmega_n
-        Delta_iw -= inverse(self.G0_iw)
+        eal_tol = params_kw.get('eal_tol', None)
+        pole_threshold = params_kw.get('pole_threshold', 0.0)
 
+        n_min = params_kw.get('n_min', None)
+        n_max = params_kw.get('n_max', None)
+        energy_window = params_kw.get('energy_window', None)
 
-        for block, block_size in self.gf_struct:
-            a = Delta_iw[block].fit_tail()
-            self.eal[block] = a[0][0]
+        backend = params_kw.get('backend', 'atom_diag')
+        # checked on all ranks, the diagonalization may run on the master rank only
+        _check_diagonalization_params(n_min, n_max, energy_window, backend)
 
-        G0_iw_F = 0*self.G_iw
-        if calc_gw:
-            G0_w_F = 0*self.G_w
+        mpi_mode = params_kw.get('mpi_mode', 'redundant')
+        if mpi_mode not in ['redundant', 'distributed']:
+            raise ValueError('Unknown mpi_mode %s'%mpi_mode)
+        comm = params_kw.get('comm', mpi.world if mpi.size > 1 else None) if mpi_mode == 'distributed' else None
+        if comm is not None and comm.Get_size() == 1:
+            comm = None
 
-        G0_iw_F << iOmega_n
-        if calc_gw:
-            G0_w_F << Omega
+        start = time.perf_counter()
+        stages = dict()
+        self.last_solve_stats = {'stages': stages, 'skipped': False}
 
-        for block, block_size in self.gf_struct:
-            G0_iw_F[block] -= self.eal[block]
-            if calc_gw:
-                G0_w_F[block] -= self.eal[block]
+        with _stage(stages, 'eal'):
+            eal, block_classes = self._atomic_levels(h_int, params_kw.get('eal', None),
+                                                     params_kw.get('equivalent_blocks', None),
+                                                     params_kw.get('eal_fit', 'fit_tail'))
+        self.equivalent_blocks = block_classes
+        if block_classes is not None:
+            self._report(1, 'Equivalent blocks: %s'%' '.join('(%s)'%', '.join(str(b) for b in block_class)
+                                                       for block_class in block_classes))
 
-        G0_iw_F = inverse(G0_iw_F)
-        if calc_gw:
-            G0_w_F = inverse(G0_w_F)
+        results = _result_names(calc_gw, calc_gtau, calc_gl, calc_dm)
+
+        self.last_solve_skipped = False
+        if eal_tol is not None:
+            h_int_key = (_operator_hash(h_int, self.fops), n_min, n_max, energy_window, pole_threshold, repr(block_classes))
+            if self._eal_converged(h_int_key, eal, eal_tol, results):
+                self._report(1, 'Atomic levels converged within eal_tol = %g, keeping the previous results'%eal_tol)
+                for name in results:
+                    setattr(self, name, _copy_result(self._converged_state['results'][name]))
+                self.last_solve_skipped = True
+                self.last_solve_stats['skipped'] = True
+                self._finish_stats(start)
+                return
+
+        self.eal = eal
+
+        with _stage(stages, 'H_loc'):
+            # the fock backend diagonalizes the Fock-space matrix of h_int, the Operator is only built for the reports
+            if backend == 'fock' and not (self.verbosity >= 1 and mpi.is_master_node()):
+                H_loc = None
+            else:
+                H_loc = self._H_loc(h_int, self.eal)
+
+        self._report(1, lambda: 'The local Hamiltonian of the problem: ' + _H_loc_summary(H_loc, self.eal, len(self.fops)))
+        self._report(2, lambda: '\nThe local Hamiltonian of the problem:\n%s\n'%H_loc)
+
+        error = None
+        if comm is None or comm.Get_rank() == 0:
+            try:
+                with _stage(stages, 'diagonalization'):
+                    self.ad = self._diagonalize(H_loc, n_min, n_max, energy_window,
+                                                params_kw.get('quantum_numbers', None), backend, h_int)
+                with _stage(stages, 'lehmann'):
+                    self.lehmann = AtomicLehmann.from_atom_diag(self.ad, self.beta, self.gf_struct, threshold=pole_threshold,
+                                                                block_classes=block_classes)
+                if calc_dm:
+                    with _stage(stages, 'dm'):
+                        self.dm = _density_matrix(self.ad, self.beta)
+                subspace_sizes = [len(e) for e in self.ad.energies]
+                self.last_solve_stats['hilbert_space_dim'] = sum(subspace_sizes)
+                self.last_solve_stats['subspace_sizes'] = sorted(subspace_sizes, reverse=True)
+            except Exception as e:
+                if comm is None:
+                    raise
+                error = e
+        else:
+            self.ad = None
+
+        if comm is not None:
+            # the other ranks must not wait for results that the master rank failed to produce
+            if comm.bcast(error is not None, root=0):
+                if error is not None:
+                    raise error
+                raise RuntimeError('HubbardI diagonalization failed on the master rank')
+
+            # only the compact eigen-data is communicated
+            with _stage(stages, 'broadcast'):
+                master = comm.Get_rank() == 0
+                self.lehmann = comm.bcast(self.lehmann if master else None, root=0)
+                self.particle_number_range = comm.bcast(self.particle_number_range, root=0)
+                self.quantum_numbers = comm.bcast(self.quantum_numbers, root=0)
+                for key in ['hilbert_space_dim', 'subspace_sizes']:
+                    self.last_solve_stats[key] = comm.bcast(self.last_solve_stats.get(key) if master else None, root=0)
+                if calc_dm:
+                    self.dm = comm.bcast(self.dm if master else None, root=0)
+
+        if pole_threshold > 0:
+            self._report(1, 'Kept %d poles with pole_threshold = %g, G(iw) error bound %.3e'
+                       %(sum(self.lehmann.n_poles.values()), pole_threshold, self.lehmann.error_bound_iw))
+
+        for name, val in self._evaluate(self.lehmann, self.eal, calc_gw, calc_gtau, calc_gl, comm, stages).items():
+            setattr(self, name, val)
+
+        if params_kw.get('calc_dlr', False):
+            with _stage(stages, 'dlr'):
+                self.G_dlr, self.Sigma_dlr, self.Sigma_dlr_inf = self._dlr(self.lehmann, self.eal,
+                                                                           params_kw.get('dlr_eps', 1e-10),
+                                                                           params_kw.get('dlr_w_max', None), comm)
+
+        if eal_tol is not None:
+            self._converged_state = {'h_int': h_int_key,
+                                     'eal': {block: np.copy(val) for block, val in self.eal.items()},
+                                     'results': {name: _copy_result(getattr(self, name)) for name in results}}
+
+        self.last_solve_stats['n_poles'] = dict(self.lehmann.n_poles)
+        self._finish_stats(start)
+
+    def _finish_stats(self, start):
+        """Complete last_solve_stats of the solve started at start and add it to cumulative_solve_stats."""
+
+        stats = self.last_solve_stats
+        stats['time'] = time.perf_counter() - start
+        stats['peak_rss_mb'] = _peak_rss_mb()
+
+        total = self.cumulative_solve_stats
+        total['n_solves'] += 1
+        total['n_skipped'] += int(stats['skipped'])
+        total['time'] += stats['time']
+        for name, stage in stats['stages'].items():
+            total['stages'][name] = total['stages'].get(name, 0.0) + stage['time']
+        total['peak_rss_mb'] = stats['peak_rss_mb']
+
+        self._report(1, 'HubbardI solve: %.3f s, %s, peak memory %s'
+                   %(stats['time'], ', '.join('%s %.3f s'%(name, stage['time']) for name, stage in stats['stages'].items()),
+                     'n/a' if stats['peak_rss_mb'] is None else '%.1f MB'%stats['peak_rss_mb']))
+
+    def reset_solve_stats(self):
+        """Reset the statistics accumulated over all solves in `cumulative_solve_stats`."""
+        self.cumulative_solve_stats = {'n_solves': 0, 'n_skipped': 0, 'time': 0.0, 'stages': dict(), 'peak_rss_mb': None}
+
+    def _dlr(self, lehmann, eal, eps, w_max=None, comm=None):
+        """
+        DLR representations of G and of Sigma - Sigma_inf, built from the poles of the
+        Lehmann representation, and the constant Sigma_inf, see :func:`_tail_moments`.
+        """
+
+        if w_max is None:
+            w_max = lehmann.dlr_w_max()
+        G_iw = lehmann.G_dlr_iw(w_max, eps, comm)
+        Sigma_inf = {block: moments[0] for block, moments in _tail_moments(lehmann, eal)[1].items()}
+        Sigma_iw = G_iw.copy()
+        for block, g in G_iw:
+            iw = np.array([complex(p.value) for p in g.mesh])
+            Sigma_iw[block].data[:] = _self_energy_data(g.data, iw, eal[block], comm) - Sigma_inf[block]
+
+        to_dlr = lambda G: BlockGf(name_list = [block for block, g in G],
+                                   block_list = [make_gf_dlr(g) for block, g in G])
+        return to_dlr(G_iw), to_dlr(Sigma_iw), Sigma_inf
+
+    def dlr_to_mesh(self, name, mesh='iw', n_points=None):
+        """
+        Evaluate the DLR result G_dlr or Sigma_dlr of the last solve on a dense mesh.
+
+        Parameters
+        ----------
+        name : str
+               'G_dlr' or 'Sigma_dlr'.
+        mesh : str, optional
+               'iw' for Matsubara frequencies or 'tau' for imaginary times.
+        n_points : integer, optional
+                   Number of mesh points, by default `n_iw` or `n_tau` of the solver.
+
+        Returns
+        -------
+        G : BlockGf
+            For 'Sigma_dlr' on 'iw', the constant `Sigma_dlr_inf` is included.
+
+        """
+
+        G_dlr = getattr(self, name)
+        if G_dlr is None:
+            raise RuntimeError('%s requires a solve with calc_dlr=True'%name)
+
+        g_list = []
+        for block, g in G_dlr:
+            if mesh == 'iw':
+                g_mesh = make_gf_imfreq(g, self.n_iw if n_points is None else n_points)
+                if name == 'Sigma_dlr':
+                    g_mesh.data[:] += self.Sigma_dlr_inf[block]
+            elif mesh == 'tau':
+                g_mesh = make_gf_imtime(g, self.n_tau if n_points is None else n_points)
+            else:
+                raise ValueError('Unknown mesh %s'%mesh)
+            g_list.append(g_mesh)
+        return BlockGf(name_list = [block for block, g in G_dlr], block_list = g_list)
+
+    def _no_lehmann_message(self, method):
+        return ("%s requires the Lehmann representation of a solve. It is only written to h5 archives "
+                "with h5_storage='lehmann' or a field list including 'lehmann'"%method)
+
+    def G_moments(self, n_moments=4):
+        """
+        Exact high-frequency moments of G_iw of the last solve, see :func:`_tail_moments`.
+
+        Returns
+        -------
+        moments : dict {block: np.array(n_moments + 1, block_size, block_size)}
+                  G_k of G(iw) = sum_k G_k/(iw)^k, starting with G_0 = 0, in the form of the
+                  `known_moments` of ``fit_tail`` and ``Gf.density``.
+
+        """
+
+        if self.lehmann is None:
+            raise RuntimeError(self._no_lehmann_message('G_moments'))
+        return _tail_moments(self.lehmann, self.eal, n_moments)[0]
+
+    def Sigma_moments(self):
+        """
+        Exact high-frequency moments of Sigma_iw of the last solve, see :func:`_tail_moments`.
+
+        Returns
+        -------
+        moments : dict {block: np.array(2, block_size, block_size)}
+                  Sigma_inf and the coefficient of 1/iw, the `known_moments` of ``fit_tail``.
+
+        """
+
+        if self.lehmann is None:
+            raise RuntimeError(self._no_lehmann_message('Sigma_moments'))
+        return _tail_moments(self.lehmann, self.eal)[1]
+
+    def density(self):
+        """
+        Density matrices of G_iw with the exact tail moments, accurate also for a
+        Matsubara mesh of a few hundred frequencies.
+
+        Returns
+        -------
+        density : dict {block: np.array(block_size, block_size)}
+
+        """
+
+        moments = self.G_moments()
+        return {block: g.density(moments[block]) for block, g in self.G_iw}
+
+    def adaptive_real_axis(self, n_per_peak=81, width=300, n_background=101, weight_tol=1e-10):
+        """
+        Green's function and self energy of the last solve on a non-uniform real-frequency
+        mesh in (w_min, w_max) that concentrates the points around the atomic poles, see
+        :meth:`AtomicLehmann.adaptive_real_freqs`. This resolves the peaks of width
+        `idelta` with a small fraction of the points of a uniform mesh.
+
+        Returns
+        -------
+        res : dict
+              The frequencies `w`, the dicts {block: array(len(w), size, size)} `G_w`
+              at w + i*idelta and `Sigma_w`, with the same convention as `Solver.Sigma_w`,
+              and the exact positions and weights
+              of the peaks, `peaks`, as returned by :meth:`AtomicLehmann.peaks`.
+
+        """
+
+        if self.lehmann is None:
+            raise RuntimeError(self._no_lehmann_message('adaptive_real_axis'))
+
+        window = (self.w_min, self.w_max)
+        w = self.lehmann.adaptive_real_freqs(window, self.idelta, n_per_peak, width, n_background, weight_tol)
+        z = w + 1j*self.idelta
+        G_w = self.lehmann.G_points(z)
+        # as for Sigma_w in solve(), G0^{-1} = w - eal with G taken at w + i*idelta
+        Sigma_w = {block: _self_energy_data(g, w, self.eal[block]) for block, g in G_w.items()}
+        return {'w': w, 'G_w': G_w, 'Sigma_w': Sigma_w, 'peaks': self.lehmann.peaks(weight_tol)}
+
+    def solve_batch(self, configs, n_workers=None, **params_kw):
+        """
+        Solve a list of independent atomic problems that share the structure of the solver,
+        e.g. for a scan of the interaction parameters.
+
+        The diagonalizations are distributed round robin over the MPI ranks when running
+        under MPI, or over a pool of `n_workers` processes otherwise. The Green's functions
+        are evaluated from the resulting Lehmann representations on all ranks.
+        The containers of the solver itself are not modified.
+
+        Worker processes are forked, which MPI implementations do not support once MPI is
+        initialized. Under mpirun, also with a single rank, the problems are therefore
+        solved one after another in place of the pool.
+
+        Parameters
+        ----------
+        configs : list of dict
+                  One dict per problem with the entries
+                      * `h_int` (Operator): the local interaction (required),
+                      * `G0_iw` (BlockGf): non-interacting Green's function to extract the atomic
+                        levels from, or
+                      * `eal` (dict {block: matrix}): the atomic levels themselves,
+                      * `key`: label of the result, defaults to the position in the list.
+                  If neither `G0_iw` nor `eal` is given, the levels are extracted from `G0_iw` of the solver.
+        n_workers : integer, optional
+                    Number of worker processes used without MPI. By default the problems are
+                    solved one after another.
+        params_kw : dict {'param':value}
+                    Parameters applied to all problems: `calc_gw`, `calc_gtau`, `calc_gl`, `calc_dm`,
+                    `n_min`, `n_max`, `energy_window`, `pole_threshold` and `eal_fit` as in
+                    :meth:`solve`. Other parameters raise a ValueError.
+
+        Returns
+        -------
+        results : dict {key: dict}
+                  For every problem the atomic levels `eal`, the Lehmann representation `lehmann`,
+                  `G_iw` and `Sigma_iw`, and the further quantities requested by the `calc_*` flags.
+
+        """
+
+        _check_params(params_kw, _batch_params, 'solve_batch')
+        _check_diagonalization_params(params_kw.get('n_min', None), params_kw.get('n_max', None),
+                                      params_kw.get('energy_window', None), 'atom_diag')
+
+        calc_gw = params_kw.get('calc_gw', False)
+        calc_gtau = params_kw.get('calc_gtau', False)
+        calc_gl = params_kw.get('calc_gl', False)
+        calc_dm = params_kw.get('calc_dm', False)
+        options = {'n_min': params_kw.get('n_min', None),
+                   'n_max': params_kw.get('n_max', None),
+                   'energy_window': params_kw.get('energy_window', None),
+                   'threshold': params_kw.get('pole_threshold', 0.0),
+                   'calc_dm': calc_dm}
+
+        keys, eals, tasks = [], [], []
+        for i, config in enumerate(configs):
+            if 'eal' in config:
+                eal = {block: np.array(config['eal'][block]) for block, block_size in self.gf_struct}
+            else:
+                eal = self._fit_eal(config.get('G0_iw', self.G0_iw), method=params_kw.get('eal_fit', 'fit_tail'))
+            keys.append(config.get('key', i))
+            eals.append(eal)
+            task_options = dict(options, n_start=_negative_levels(eal))
+            tasks.append((_operator_terms(self._H_loc(config['h_int'], eal)), self.fops, self.gf_struct, self.beta, task_options))
+
+        self._report(1, 'TRIQS: HubbardI solver, batch of %d problems'%len(tasks))
+
+        if mpi.size > 1:
+            local = {i: _lehmann_task(*tasks[i]) for i in range(mpi.rank, len(tasks), mpi.size)}
+            solved = [mpi.world.bcast(local.get(i), root=i % mpi.size) for i in range(len(tasks))]
+        elif n_workers is not None and n_workers > 1 and not _mpi_initialized():
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                solved = list(pool.map(_lehmann_task, *zip(*tasks)))
+        else:
+            if n_workers is not None and n_workers > 1:
+                self._report(0, 'Warning: MPI is initialized, solving the batch without worker processes')
+            solved = [_lehmann_task(*task) for task in tasks]
+
+        results = dict()
+        for key, eal, (lehmann, dm, sizes) in zip(keys, eals, solved):
+            results[key] = self._evaluate(lehmann, eal, calc_gw, calc_gtau, calc_gl)
+            results[key]['eal'] = eal
+            results[key]['lehmann'] = lehmann
+            if calc_dm:
+                results[key]['dm'] = dm
+
+        return results
+
+    def solve_temperatures(self, betas, **params_kw):
+        """
+        Solve the impurity problem for a list of temperatures from a single diagonalization.
+
+        The atomic levels are extracted from `G0_iw` as in :meth:`solve` and the local
+        Hamiltonian is diagonalized once. For every temperature the Lehmann representation
+        is rebuilt with the corresponding thermal weights and evaluated on a Matsubara mesh
+        with `n_iw` frequencies for that temperature. `ad` and `eal` of the solver are
+        updated, its Green's function containers are not modified.
+
+        Parameters
+        ----------
+        betas : list of scalars
+                Inverse temperatures.
+        params_kw : dict {'param':value}
+                    `h_int` (required), `calc_gw`, `calc_gtau`, `calc_gl`, `calc_dm`, `n_min`, `n_max`,
+                    `energy_window`, `pole_threshold`, `eal`, `eal_fit`, `quantum_numbers` and
+                    `backend` as in :meth:`solve`. Other parameters raise a ValueError. A truncation
+                    of the Hilbert space has to be suitable for the highest temperature.
+
+        Returns
+        -------
+        results : dict {beta: dict}
+                  For every temperature the Lehmann representation `lehmann`, `G_iw` and
+                  `Sigma_iw`, and the further quantities requested by the `calc_*` flags.
+
+        """
+
+        _check_params(params_kw, _temperature_params, 'solve_temperatures')
+        self._report(1, 'TRIQS: HubbardI solver, %d temperatures'%len(betas))
+
+        calc_gw = params_kw.get('calc_gw', False)
+        calc_gtau = params_kw.get('calc_gtau', False)
+        calc_gl = params_kw.get('calc_gl', False)
+        calc_dm = params_kw.get('calc_dm', False)
+        pole_threshold = params_kw.get('pole_threshold', 0.0)
+
+        self.eal = self._atomic_levels(params_kw['h_int'], params_kw.get('eal', None), None,
+                                       params_kw.get('eal_fit', 'fit_tail'))[0]
+        backend = params_kw.get('backend', 'atom_diag')
+        H_loc = None if backend == 'fock' else self._H_loc(params_kw['h_int'], self.eal)
+        self.ad = self._diagonalize(H_loc, params_kw.get('n_min', None), params_kw.get('n_max', None),
+                                    params_kw.get('energy_window', None), params_kw.get('quantum_numbers', None),
+                                    backend, params_kw['h_int'])
+
+        results = dict()
+        for beta in betas:
+            lehmann = AtomicLehmann.from_atom_diag(self.ad, beta, self.gf_struct, threshold=pole_threshold)
+            results[beta] = self._evaluate(lehmann, self.eal, calc_gw, calc_gtau, calc_gl)
+            results[beta]['lehmann'] = lehmann
+            if calc_dm:
+                results[beta]['dm'] = _density_matrix(self.ad, beta)
+
+        return results
+
+    def _diagonalize(self, H_loc, n_min, n_max, energy_window, quantum_numbers=None, backend='atom_diag', h_int=None):
+        """
+        Diagonalize H_loc, restricted to the particle-number range given by
+        n_min/n_max or chosen from energy_window, or partitioned by quantum numbers.
+        With backend='fock', the cached Fock-space matrix of h_int plus the
+        one-body matrix of self.eal is diagonalized instead, and H_loc may be None.
+        """
+
+        _check_diagonalization_params(n_min, n_max, energy_window, backend)
+
+        gs_energy = None
+        if backend == 'fock':
+            H = self._fock_matrix(h_int, self.eal)
+            gs_energy = lambda n: self._fock.diagonalize(H, n, n).gs_energy
+            diagonalize_range = lambda n_min, n_max: self._fock.diagonalize(H, n_min, n_max)
+        else:
+            diagonalize_range = lambda n_min, n_max: self._atom_diag(H_loc, n_min, n_max, None)
+
+        ad = None
+        if energy_window is not None:
+            n_start = self.particle_number_range
+            if n_start is not None:
+                # the range of the previous solve is kept without probing sectors if it still brackets the window
+                ad = diagonalize_range(*n_start)
+                if _brackets_window(ad, n_start[0], n_start[1], len(self.fops), energy_window):
+                    n_min, n_max = n_start
+                    self._report(1, 'Particle-number range %d to %d still contains energy_window'%n_start)
+                else:
+                    ad = None
+            else:
+                n_start = _negative_levels(self.eal)
+            if ad is None:
+                n_min, n_max = _particle_number_range(H_loc, self.fops, energy_window, n_start, gs_energy)
+        elif n_min is not None or n_max is not None:
+            n_min = 0 if n_min is None else n_min
+            n_max = len(self.fops) if n_max is None else n_max
+
+        qn = None
+        self.quantum_numbers = None
+        if quantum_numbers is not None and backend == 'fock':
+            self._report(0, 'Warning: quantum_numbers are ignored by the fock backend')
+        elif quantum_numbers is not None and n_min is not None:
+            self._report(0, 'Warning: quantum_numbers are ignored for a restricted particle-number range')
+        elif quantum_numbers is not None:
+            if isinstance(quantum_numbers, str) and quantum_numbers == 'auto':
+                detected = detect_quantum_numbers(H_loc, self.gf_struct)
+                self.quantum_numbers = list(detected.keys())
+                qn = list(detected.values())
+                self._report(1, 'Conserved quantum numbers: %s'%', '.join(self.quantum_numbers))
+            else:
+                qn = list(quantum_numbers)
+
+        if ad is None and backend == 'fock':
+            ad = self._fock.diagonalize(H, n_min, n_max)
+        elif ad is None:
+            ad = self._atom_diag(H_loc, n_min, n_max, qn)
+
+        sizes = sorted((len(e) for e in ad.energies), reverse=True)
+        self._report(1, 'Hilbert space: %d states in %d subspaces, largest subspaces: %s'
+                   %(sum(sizes), len(sizes), ' '.join(str(d) for d in sizes[:5])))
+
+        if n_min is not None:
+            self.particle_number_range = (n_min, n_max)
+            self._report(1, 'Diagonalization restricted to %d to %d particles: %d of %d states'
+                       %(n_min, n_max, sum(sizes), 2**len(self.fops)))
+        else:
+            self.particle_number_range = None
+
+        return ad
+
+    def _fock_matrix(self, h_int, eal):
+        """
+        Sparse Fock-space matrix of h_int plus the one-body term of eal. The matrix
+        of h_int is built once and reused as long as h_int does not change.
+        """
+
+        if self._fock is None:
+            self._fock = FockSpace(self.fops)
+
+        key = _operator_hash(h_int, self.fops)
+        if self._h_int_matrix is not None and self._h_int_matrix[0] == key:
+            self._report(1, 'Reusing the Fock-space matrix of h_int')
+        else:
+            self._h_int_matrix = (key, self._fock.operator_matrix(h_int))
+        return self._h_int_matrix[1] + self._fock.one_body_matrix(eal)
+
+    def _fit_eal(self, G0_iw, blocks=None, method='fit_tail'):
+        """
+        Atomic levels as the constant of the high-frequency tail of iw - G0_iw^{-1},
+        for all blocks or only the given ones, obtained with fit_tail or, for
+        method='lstsq', with _tail_constants.
+        """
+
+        if blocks is None:
+            blocks = [block for block, block_size in self.gf_struct]
+
+        if method == 'lstsq':
+            return _tail_constants({block: G0_iw[block].data for block in blocks}, G0_iw[blocks[0]].mesh.beta)
+        elif method != 'fit_tail':
+            raise ValueError('Unknown eal_fit %s'%method)
+
+        eal = dict()
+        for block in blocks:
+            Delta_iw = 0*G0_iw[block]
+            Delta_iw << iOmega_n
+            Delta_iw -= inverse(G0_iw[block])
+            a = Delta_iw.fit_tail()
+            eal[block] = a[0][0]
+        return eal
+
+    def _atomic_levels(self, h_int, eal=None, equivalent_blocks=None, eal_fit='fit_tail'):
+        """
+        Atomic levels and classes of equivalent blocks for the eal, equivalent_blocks
+        and eal_fit parameters of solve. The levels are taken from eal if given and
+        fitted from G0_iw otherwise. The levels of the blocks of a class are made identical.
+        """
+
+        sizes = dict(self.gf_struct)
+        if eal is not None:
+            eal = {block: np.array(eal[block]).reshape(block_size, block_size) for block, block_size in self.gf_struct}
+
+        if equivalent_blocks is None:
+            return (self._fit_eal(self.G0_iw, method=eal_fit) if eal is None else eal), None
+
+        if isinstance(equivalent_blocks, str) and equivalent_blocks == 'auto':
+            if eal is None:
+                eal = self._fit_eal(self.G0_iw, method=eal_fit)
+            classes = find_equivalent_blocks(h_int, eal, self.gf_struct)
+            for block_class in classes:
+                mean = sum(eal[block] for block in block_class)/len(block_class)
+                for block in block_class:
+                    eal[block] = np.copy(mean)
+            return eal, classes
+
+        classes = [list(block_class) for block_class in equivalent_blocks]
+        blocks = [block for block_class in classes for block in block_class]
+        if sorted(blocks) != sorted(sizes.keys()):
+            raise ValueError('equivalent_blocks has to contain every block exactly once')
+        if any(sizes[block] != sizes[block_class[0]] for block_class in classes for block in block_class):
+            raise ValueError('equivalent blocks must have the same size')
+
+        if eal is None:
+            eal = self._fit_eal(self.G0_iw, [block_class[0] for block_class in classes], eal_fit)
+        for block_class in classes:
+            for block in block_class[1:]:
+                eal[block] = np.copy(eal[block_class[0]])
+        return eal, classes
+
+    def _H_loc(self, h_int, eal, tol=1e-12):
+        """
+        Local Hamiltonian h_int plus the one-body term of the atomic levels eal,
+        summing the precomputed bilinears of the elements of eal larger than tol.
+        """
 
         H_loc = 1.0*h_int
         for block, block_size in self.gf_struct:
-            for ii in range(block_size):
-                for jj in range(block_size):
-                    H_loc += self.eal[block][ii,jj]*c_dag(block,ii)*c(block,jj)
+            bilinears = self._bilinears[block]
+            for ii, jj in zip(*np.nonzero(np.abs(eal[block]) > tol)):
+                H_loc += eal[block][ii,jj]*bilinears[ii][jj]
+        return H_loc
 
-        mpi.report('\n')
-        mpi.report('The local Hamiltonian of the problem:')
-        mpi.report(H_loc)
-        mpi.report('\n')
+    def _evaluate(self, lehmann, eal, calc_gw, calc_gtau, calc_gl, comm=None, stages=None):
+        """
+        Green's functions and self energies on the meshes of the solver from a Lehmann
+        representation. With an MPI communicator comm, the mesh points are distributed.
+        The time and memory of every evaluation are recorded in the dict stages.
+        """
 
-        self.ad = AtomDiag(H_loc, self.fops)
+        if stages is None:
+            stages = dict()
 
-        self.G_iw = atomic_g_iw(self.ad, self.beta, self.gf_struct, self.n_iw )
+        res = dict()
+        with _stage(stages, 'G_iw'):
+            res['G_iw'] = lehmann.G_iw(self.n_iw, comm)
         if calc_gw:
-            self.G_w = atomic_g_w(self.ad, self.beta, self.gf_struct, (self.w_min,self.w_max), self.n_w, self.idelta)
+            with _stage(stages, 'G_w'):
+                res['G_w'] = lehmann.G_w((self.w_min,self.w_max), self.n_w, self.idelta, comm)
         if calc_gtau:
-            self.G_tau = atomic_g_tau(self.ad, self.beta, self.gf_struct, self.n_tau )
+            with _stage(stages, 'G_tau'):
+                res['G_tau'] = lehmann.G_tau(self.n_tau, comm)
         if calc_gl:
-            self.G_l = atomic_g_l(self.ad, self.beta, self.gf_struct, self.n_l )
-        if calc_dm:
-            self.dm = atomic_density_matrix(self.ad, self.beta)
+            with _stage(stages, 'G_l'):
+                res['G_l'] = lehmann.G_l(self.n_l, comm)
 
-        self.Sigma_iw = inverse(G0_iw_F) - inverse(self.G_iw)
+        # Sigma = G0^{-1} - G^{-1} with the atomic G0^{-1}(z) = z - eal
+        with _stage(stages, 'Sigma_iw'):
+            res['Sigma_iw'] = _self_energy(res['G_iw'], matsubara_freqs(lehmann.beta, self.n_iw), eal, comm,
+                                           lehmann.block_classes)
         if calc_gw:
-            self.Sigma_w = inverse(G0_w_F) - inverse(self.G_w)
+            with _stage(stages, 'Sigma_w'):
+                res['Sigma_w'] = _self_energy(res['G_w'], real_freqs((self.w_min,self.w_max), self.n_w), eal, comm,
+                                              lehmann.block_classes)
+        return res
+
+    def _eal_converged(self, h_int_key, eal, eal_tol, results):
+        """
+        Check whether eal agrees within eal_tol with the atomic levels of the
+        last solve with the same h_int, and whether all requested results are
+        available from that solve.
+        """
+
+        state = self._converged_state
+        if state is None or state['h_int'] != h_int_key:
+            return False
+        if any(name not in state['results'] for name in results):
+            return False
+        return all(np.max(np.abs(eal[block] - state['eal'][block]), initial=0.0) <= eal_tol
+                   for block, block_size in self.gf_struct)
+
+    def _atom_diag(self, H_loc, n_min=None, n_max=None, qn=None):
+        """
+        Return the AtomDiag object of H_loc, taking it from the cache if an
+        identical Hamiltonian (on identical fops, particle-number range and
+        quantum numbers) was diagonalized before.
+        """
+
+        if n_min is not None:
+            make_ad = lambda: AtomDiag(H_loc, self.fops, n_min, n_max)
+        elif qn is not None:
+            make_ad = lambda: AtomDiag(H_loc, self.fops, qn)
+        else:
+            make_ad = lambda: AtomDiag(H_loc, self.fops)
 
+        if self.ad_cache_size <= 0:
+            return make_ad()
 
+        qn_key = None if qn is None else tuple(_operator_hash(Q, self.fops) for Q in qn)
+        key = (_operator_hash(H_loc, self.fops), n_min, n_max, qn_key)
+        if key in self._ad_cache:
+            self._ad_cache_hits += 1
+            self._ad_cache.move_to_end(key)
+            self._report(1, 'AtomDiag cache hit, skipping the diagonalization')
+            return self._ad_cache[key]
 
+        self._ad_cache_misses += 1
+        ad = make_ad()
+        self._ad_cache[key] = ad
+        while len(self._ad_cache) > self.ad_cache_size:
+            self._ad_cache.popitem(last=False)
+        return ad
+
+    def ad_cache_info(self):
+        """
+        Statistics of the AtomDiag cache.
+
+        Returns
+        -------
+        info : dict
+               Number of cache ``hits`` and ``misses`` since the last clear,
+               current ``size`` and ``maxsize`` of the cache.
+
+        """
+        return {'hits': self._ad_cache_hits, 'misses': self._ad_cache_misses,
+                'size': len(self._ad_cache), 'maxsize': self.ad_cache_size}
+
+    def clear_ad_cache(self):
+        """Remove all AtomDiag objects from the cache and reset its counters."""
+        self._ad_cache.clear()
+        self._ad_cache_hits = 0
+        self._ad_cache_misses = 0
 
     def __reduce_to_dict__(self):
-        store_dict = {'G0_w': self.G0_w, 'G0_iw': self.G0_iw,'G_tau': self.G_tau,
-                      'G_l': self.G_l, 'Sigma_iw': self.Sigma_iw, 'G_iw': self.G_iw,
-                      'Sigma_w': self.Sigma_w, 'G_w': self.G_w,
-                      'gf_struct': self.gf_struct, 'n_iw': self.n_iw, 'n_w': self.n_w,
+        store_dict = {'gf_struct': self.gf_struct, 'n_iw': self.n_iw, 'n_w': self.n_w,
                       'n_tau': self.n_tau, 'n_l': self.n_l,'beta': self.beta,
                       'w_min': self.w_min,'w_max': self.w_max,
                       'idelta': self.idelta,'fops': self.fops,'eal':self.eal}
-        if hasattr(self, 'ad'):
+
+        if isinstance(self.h5_storage, str):
+            if self.h5_storage not in _storage_policies:
+                raise ValueError('Unknown h5_storage %s'%self.h5_storage)
+            fields = _storage_policies[self.h5_storage]
+        else:
+            fields = set(self.h5_storage)
+
+        for name in ['G0_iw', 'Sigma_iw', 'G_iw']:
+            if name in fields:
+                store_dict[name] = getattr(self, name)
+        # lazy containers are only stored once they have been allocated
+        for name in ['G0_w', 'G_tau', 'G_l', 'Sigma_w', 'G_w']:
+            if name in fields and name in self.__dict__:
+                store_dict[name] = self.__dict__[name]
+        for name in ['G_dlr', 'Sigma_dlr', 'Sigma_dlr_inf']:
+            if name in fields and getattr(self, name) is not None:
+                store_dict[name] = getattr(self, name)
+        if 'ad' in fields and getattr(self, 'ad', None) is not None and not isinstance(self.ad, FockDiag):
             store_dict['ad'] = self.ad
+        if 'lehmann' in fields and self.lehmann is not None:
+            # the results are evaluated from the poles when the archive is read
+            store_dict['lehmann'] = self.lehmann
+            store_dict['lehmann_results'] = [name for name in ['G_w', 'G_tau', 'G_l']
+                                             if name in self.__dict__ and name not in fields]
+        if self.store_solve_stats and self.last_solve_stats is not None:
+            store_dict['last_solve_stats'] = _without_none(self.last_solve_stats)
+            store_dict['cumulative_solve_stats'] = _without_none(self.cumulative_solve_stats)
 
         return store_dict
 
+    @classmethod
+    def from_archive(cls, filename, key='Solver', lazy=True):
+        """
+        Restore a Solver written to an h5 archive.
+
+        With lazy=True only the parameters and the atomic levels are read. The
+        Green's functions, `ad` and `lehmann` are read from the archive when they
+        are first accessed, and results stored as a Lehmann representation are
+        evaluated then. The file has to remain available until then.
+
+        Parameters
+        ----------
+        filename : str
+                   Name of the h5 file.
+        key : str, optional
+              Path of the Solver in the archive, e.g. 'dmft/it_5/Solver'.
+        lazy : bool, optional
+               If False, the complete Solver is read at once.
+
+        """
+
+        with h5_lock, HDFArchive(filename, 'r') as ar:
+            parts = key.strip('/').split('/')
+            parent = _archive_group(ar, '/'.join(parts[:-1])) if len(parts) > 1 else ar
+            if not lazy:
+                return parent[parts[-1]]
+
+            group = parent.get_raw(parts[-1])
+            fields = set(group.keys())
+            D = {name: group[name] for name in ['beta', 'gf_struct', 'n_iw', 'n_tau', 'n_l', 'n_w',
+                                                 'w_min', 'w_max', 'idelta', 'fops', 'eal']}
+            lehmann_results = list(group['lehmann_results']) if 'lehmann_results' in fields else []
+            stats = {name: group[name] for name in ['last_solve_stats', 'cumulative_solve_stats'] if name in fields}
+            # the DLR results are small and read at once
+            dlr = {name: group[name] for name in ['G_dlr', 'Sigma_dlr', 'Sigma_dlr_inf'] if name in fields}
+
+        instance = cls(D['beta'], D['gf_struct'], D['n_iw'], D['n_tau'],
+                       D['n_l'], D['n_w'], D['w_min'], D['w_max'], D['idelta'])
+        instance.gf_struct = fix_gf_struct_type(D['gf_struct'])
+        instance.fops = D['fops']
+        instance.eal = D['eal']
+        if stats:
+            instance.store_solve_stats = True
+            for name, val in stats.items():
+                setattr(instance, name, val)
+        for name, val in dlr.items():
+            setattr(instance, name, val)
+
+        derived = []
+        if 'lehmann' in fields:
+            del instance.__dict__['lehmann']
+            derived = ['G_iw', 'Sigma_iw'] + lehmann_results + (['Sigma_w'] if 'G_w' in lehmann_results else [])
+        instance._h5_source = {'filename': filename, 'key': key, 'fields': fields,
+                               'derived': [name for name in derived if name not in fields]}
+        return instance
+
+    def _in_archive(self, name):
+        """Whether the field name can be read from the archive the Solver was lazily restored from."""
+        source = self.__dict__.get('_h5_source')
+        return source is not None and (name in source['fields'] or name in source['derived'])
+
+    def _read_archive_field(self, name):
+        """Read the field name from the archive, or evaluate it from the Lehmann representation there."""
+
+        source = self._h5_source
+        if name in source['fields']:
+            with h5_lock, HDFArchive(source['filename'], 'r') as ar:
+                return _archive_group(ar, source['key'])[name]
+
+        derived = source['derived']
+        res = self._evaluate(self.lehmann, self.eal, 'G_w' in derived, 'G_tau' in derived, 'G_l' in derived)
+        for other in derived:
+            if other != name and other not in self.__dict__:
+                self.__dict__[other] = res[other]
+        return res[name]
+
     @classmethod
     def __factory_from_dict__(cls,name,D) :
 
         instance = cls(D['beta'], D['gf_struct'], D['n_iw'], D['n_tau'],
                        D['n_l'], D['n_w'], D['w_min'], D['w_max'], D['idelta'])
 
-        instance.G0_w = D['G0_w']
-        instance.G0_iw = D['G0_iw']
-        instance.G_tau = D['G_tau']
-        instance.G_l = D['G_l']
-        instance.Sigma_iw = D['Sigma_iw']
-        instance.G_iw = D['G_iw']
-        instance.Sigma_w = D['Sigma_w']
-        instance.G_w = D['G_w']
         instance.gf_struct = fix_gf_struct_type(D['gf_struct'])
         instance.fops = D['fops']
         instance.eal = D['eal']
-        instance.ad = D['ad']
+        if 'lehmann' in D:
+            instance.lehmann = D['lehmann']
+            names = list(D.get('lehmann_results', []))
+            # only evaluate results that were stored as the Lehmann representation alone
+            if any(name not in D for name in ['G_iw', 'Sigma_iw'] + names):
+                res = instance._evaluate(instance.lehmann, instance.eal, 'G_w' in names, 'G_tau' in names, 'G_l' in names)
+                for name, val in res.items():
+                    setattr(instance, name, val)
+        for name in ['G0_iw', 'Sigma_iw', 'G_iw', 'G0_w', 'G_tau', 'G_l', 'Sigma_w', 'G_w',
+                     'G_dlr', 'Sigma_dlr', 'Sigma_dlr_inf']:
+            if name in D:
+                setattr(instance, name, D[name])
+        if 'ad' in D:
+            instance.ad = D['ad']
+        if 'last_solve_stats' in D:
+            instance.store_solve_stats = True
+            instance.last_solve_stats = D['last_solve_stats']
+            instance.cumulative_solve_stats = D['cumulative_solve_stats']
 
         return instance
 
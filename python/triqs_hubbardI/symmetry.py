@@ -0,0 +1,129 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+from triqs.operators import Operator, c, c_dag, n
+import numpy as np
+
+def _spin(block):
+    """Spin projection +1/2 or -1/2 of a block named 'up', 'up_0', 'down', 'dn_1', ..., None otherwise."""
+    prefix = block.split('_')[0]
+    if prefix == 'up':
+        return 0.5
+    if prefix in ['down', 'dn']:
+        return -0.5
+    return None
+
+def commutes(A, B, tol=1e-10):
+    """True if all coefficients of the commutator [A, B] are below tol."""
+    return all(abs(coef) < tol for monomial, coef in A*B - B*A)
+
+def standard_quantum_numbers(gf_struct):
+    """
+    Candidate conserved quantities of a local Hamiltonian with the given block structure.
+
+    Returns
+    -------
+    candidates : dict {name: Operator}
+                 The total particle number 'N' and, for more than one block, the particle
+                 numbers 'N_<block>' of the blocks. If the block names carry the spin ('up'/'down'),
+                 also 'Sz', and if there is one block of odd size 2l+1 per spin, 'Jz' with the
+                 orbital index i of a block read as the magnetic quantum number m = i - l, as in
+                 the spherical basis of ``triqs.operators.util``. For a single block of size
+                 2(2l+1), the spin-orbit coupled layout of ``map_operator_structure`` with the
+                 up orbitals first, also 'Sz' and 'Jz' with m = (i mod 2l+1) - l.
+
+    """
+
+    candidates = dict()
+    candidates['N'] = sum(n(block, ii) for block, block_size in gf_struct for ii in range(block_size))
+    if len(gf_struct) > 1:
+        for block, block_size in gf_struct:
+            candidates['N_%s'%block] = sum(n(block, ii) for ii in range(block_size))
+
+    spins = {block: _spin(block) for block, block_size in gf_struct}
+    if all(s is not None for s in spins.values()) and len(set(spins.values())) == 2:
+        candidates['Sz'] = sum(spins[block]*n(block, ii) for block, block_size in gf_struct for ii in range(block_size))
+
+        sizes = [block_size for block, block_size in gf_struct]
+        if len(gf_struct) == 2 and sizes[0] == sizes[1] and sizes[0] % 2 == 1:
+            l = sizes[0]//2
+            candidates['Jz'] = sum((ii - l + spins[block])*n(block, ii) for block, block_size in gf_struct for ii in range(block_size))
+
+    if len(gf_struct) == 1 and gf_struct[0][1] % 4 == 2:
+        block, block_size = gf_struct[0]
+        n_orb = block_size//2
+        l = n_orb//2
+        spin = lambda ii: 0.5 if ii < n_orb else -0.5
+        candidates['Sz'] = sum(spin(ii)*n(block, ii) for ii in range(block_size))
+        candidates['Jz'] = sum((ii % n_orb - l + spin(ii))*n(block, ii) for ii in range(block_size))
+
+    return candidates
+
+def detect_quantum_numbers(H, gf_struct, tol=1e-10):
+    """
+    Standard quantum numbers (see :func:`standard_quantum_numbers`) conserved by H.
+
+    Returns
+    -------
+    quantum_numbers : dict {name: Operator}
+                      The candidates that commute with H.
+
+    """
+    return {name: Q for name, Q in standard_quantum_numbers(gf_struct).items() if commutes(H, Q, tol)}
+
+def _swap_blocks(op, block_a, block_b):
+    """The Operator op with the indices of the blocks block_a and block_b exchanged."""
+    swap = {block_a: block_b, block_b: block_a}
+    res = Operator()
+    for monomial, coef in op:
+        term = coef
+        for dagger, (block, ii) in monomial:
+            idx = (swap.get(block, block), ii)
+            term = term * (c_dag(*idx) if dagger else c(*idx))
+        res += term
+    return res
+
+def equivalent_blocks(h_int, eal, gf_struct, tol=1e-8):
+    """
+    Classes of equivalent blocks of the atomic problem.
+
+    Two blocks are equivalent if they have the same size, their atomic levels agree
+    within tol, and h_int is invariant under the exchange of the two blocks. Their
+    Green's functions and self energies are then identical.
+
+    Returns
+    -------
+    classes : list of lists of str
+              The classes in the order of gf_struct, each starting with its first block.
+
+    """
+
+    sizes = dict(gf_struct)
+    classes = []
+    for block, block_size in gf_struct:
+        for cls in classes:
+            rep = cls[0]
+            if (sizes[rep] == block_size and np.max(np.abs(eal[rep] - eal[block]), initial=0.0) < tol
+                    and all(abs(coef) < tol for monomial, coef in h_int - _swap_blocks(h_int, rep, block))):
+                cls.append(block)
+                break
+        else:
+            classes.append([block])
+    return classes
@@ -0,0 +1,53 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import n
+import numpy as np
+
+U, e_f = 4.0, -2.0
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=50, n_w=30001, idelta=0.01)
+S.G0_iw << inverse(iOmega_n - e_f)
+S.solve(h_int=U*n('up',0)*n('down',0), calc_gw=True)
+
+res = S.adaptive_real_axis()
+w = res['w']
+assert len(w) < S.n_w/50
+
+# exact peaks of the half-filled Hubbard atom
+positions, weights = res['peaks']['up']
+np.testing.assert_array_almost_equal(positions, [e_f, e_f + U], decimal=6)
+np.testing.assert_array_almost_equal(weights, [0.5, 0.5], decimal=6)
+for E in positions:
+    assert np.min(np.abs(w - E)) < 1e-12
+
+# agrees with the dense uniform mesh
+w_uniform = np.linspace(S.w_min, S.w_max, S.n_w)
+for name in ['up', 'down']:
+    A = -res['G_w'][name][:,0,0].imag/np.pi
+    A_uniform = -S.G_w[name].data[:,0,0].imag/np.pi
+    assert np.max(np.abs(np.interp(w_uniform, w, A) - A_uniform)) < 0.01*np.max(A_uniform)
+    on_mesh = np.abs(w_uniform[:,None] - w[None,:]) < 1e-9
+    i_uniform, i_adaptive = np.nonzero(on_mesh)
+    np.testing.assert_array_almost_equal(res['Sigma_w'][name][i_adaptive,0,0], S.Sigma_w[name].data[i_uniform,0,0])
@@ -0,0 +1,53 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import *
+import numpy as np
+
+D, V, U = 1.0, 0.2, 4.0
+e_f, beta = -U/2.0, 50
+S = Solver(beta = beta, gf_struct = [ ('up',1), ('down',1) ],n_iw=20,n_tau=2,n_w=2,ad_cache_size=2)
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n - e_f - V**2 * Wilson(D))
+
+h_int = U * n('up',0) * n('down',0)
+
+S.solve(h_int = h_int)
+G_iw_first = S.G_iw.copy()
+assert S.ad_cache_info()['misses'] == 1 and S.ad_cache_info()['hits'] == 0
+
+# identical problem: the diagonalization must be taken from the cache
+S.solve(h_int = h_int)
+assert S.ad_cache_info()['misses'] == 1 and S.ad_cache_info()['hits'] == 1
+for (name, g1), (name, g2) in zip(S.G_iw, G_iw_first):
+    np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# two new Hamiltonians: the first one gets evicted
+S.solve(h_int = 2*h_int)
+S.solve(h_int = 3*h_int)
+S.solve(h_int = h_int)
+info = S.ad_cache_info()
+assert info['misses'] == 4 and info['hits'] == 1 and info['size'] == 2
+
+S.clear_ad_cache()
+assert S.ad_cache_info()['size'] == 0
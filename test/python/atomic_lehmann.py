@@ -0,0 +1,61 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.atom_diag import *
+import triqs.operators.util as op
+import numpy as np
+
+beta = 10.0
+l = 1
+n_orbs = 2*l + 1
+U, J, mu = 4.0, 0.6, 4.0
+spin_names = ['up','down']
+orb_names = [i for i in range(n_orbs)]
+
+gf_struct = op.set_operator_structure(spin_names,orb_names,off_diag=True)
+U_mat = op.U_matrix_slater(l=l, U_int=U, J_hund=J, basis='spherical')
+H = op.h_int_slater(spin_names,orb_names,U_mat,off_diag=True)
+
+S = Solver(beta=beta, gf_struct=gf_struct, n_iw=50, n_tau=101, n_l=20, n_w=100, idelta=0.1)
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n + mu)
+S.solve(h_int=H, calc_gw=True, calc_gtau=True, calc_gl=True)
+
+# compare the pole representation against the direct evaluation of atom_diag
+G_iw = atomic_g_iw(S.ad, beta, gf_struct, S.n_iw)
+G_w = atomic_g_w(S.ad, beta, gf_struct, (S.w_min,S.w_max), S.n_w, S.idelta)
+G_tau = atomic_g_tau(S.ad, beta, gf_struct, S.n_tau)
+G_l = atomic_g_l(S.ad, beta, gf_struct, S.n_l)
+
+for G, G_ref in [(S.G_iw, G_iw), (S.G_w, G_w), (S.G_tau, G_tau), (S.G_l, G_l)]:
+    for (name, g1), (name, g2) in zip(G, G_ref):
+        np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# evaluation on a different mesh only requires the stored poles
+for (name, g1), (name, g2) in zip(S.lehmann.G_iw(200), atomic_g_iw(S.ad, beta, gf_struct, 200)):
+    np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# the residues of each block sum up to the identity
+for block, block_size in gf_struct:
+    np.testing.assert_array_almost_equal(S.lehmann.residues[block].sum(axis=0), np.eye(block_size))
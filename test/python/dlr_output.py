@@ -0,0 +1,51 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import n
+import numpy as np
+
+U, e_f = 4.0, -2.0
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=200, n_tau=1001)
+S.G0_iw << inverse(iOmega_n - e_f)
+
+S.solve(h_int=U*n('up',0)*n('down',0), calc_gtau=True)
+assert S.G_dlr is None and S.Sigma_dlr is None
+
+S.solve(h_int=U*n('up',0)*n('down',0), calc_gtau=True, calc_dlr=True, dlr_eps=1e-12)
+assert len(S.G_dlr['up'].mesh) < 50
+
+# Sigma = U/2 + U^2/4 / iw for the half-filled Hubbard atom
+np.testing.assert_array_almost_equal(S.Sigma_dlr_inf['up'], [[U/2]])
+
+G_iw = S.dlr_to_mesh('G_dlr', 'iw')
+Sigma_iw = S.dlr_to_mesh('Sigma_dlr', 'iw')
+G_tau = S.dlr_to_mesh('G_dlr', 'tau')
+for name in ['up', 'down']:
+    np.testing.assert_array_almost_equal(G_iw[name].data, S.G_iw[name].data, decimal=8)
+    np.testing.assert_array_almost_equal(Sigma_iw[name].data, S.Sigma_iw[name].data, decimal=8)
+    np.testing.assert_array_almost_equal(G_tau[name].data, S.G_tau[name].data, decimal=8)
+
+# any number of points on demand
+assert len(S.dlr_to_mesh('G_dlr', 'iw', 1000)['up'].mesh) == 2000
@@ -0,0 +1,51 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+import numpy as np
+
+# two orbitals with Kanamori interaction, spin-split levels and a 1/iw hybridization tail
+U_mat, Uprime_mat = op.U_matrix_kanamori(n_orb=2, U_int=3.0, J_hund=0.5)
+gf_struct = [('up',2), ('down',2)]
+H = op.h_int_kanamori(['up','down'], [0, 1], U_mat, Uprime_mat, 0.5, off_diag=True)
+levels = {'up': -1.6, 'down': -1.4}
+
+S_fit = Solver(beta=20.0, gf_struct=gf_struct, n_iw=200)
+for name, g0 in S_fit.G0_iw: g0 << inverse(iOmega_n - levels[name] - 0.25*inverse(iOmega_n))
+S_fit.solve(h_int=H)
+
+# single least-squares fit of all blocks
+S_lstsq = Solver(beta=20.0, gf_struct=gf_struct, n_iw=200)
+S_lstsq.G0_iw << S_fit.G0_iw
+S_lstsq.solve(h_int=H, eal_fit='lstsq')
+
+# levels given directly, G0_iw is not used
+S_eal = Solver(beta=20.0, gf_struct=gf_struct, n_iw=200)
+S_eal.solve(h_int=H, eal={name: e*np.eye(2) for name, e in levels.items()})
+
+for name, e in levels.items():
+    np.testing.assert_array_almost_equal(S_lstsq.eal[name], e*np.eye(2), decimal=6)
+    np.testing.assert_array_almost_equal(S_fit.eal[name], e*np.eye(2), decimal=5)
+    np.testing.assert_array_almost_equal(S_eal.G_iw[name].data, S_lstsq.G_iw[name].data, decimal=5)
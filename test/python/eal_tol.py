@@ -0,0 +1,58 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import *
+import numpy as np
+
+D, V, U = 1.0, 0.2, 4.0
+e_f, beta = -U/2.0, 50
+S = Solver(beta = beta, gf_struct = [ ('up',1), ('down',1) ],n_iw=20,n_tau=2,n_w=20)
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n - e_f - V**2 * Wilson(D))
+
+h_int = U * n('up',0) * n('down',0)
+
+S.solve(h_int = h_int, calc_gw = True, eal_tol = 1e-8)
+assert not S.last_solve_skipped
+G_iw_ref, Sigma_w_ref = S.G_iw.copy(), S.Sigma_w.copy()
+
+# results overwritten by the user (as in a DMFT loop) are restored from the solver
+S.G_iw.zero()
+S.solve(h_int = h_int, calc_gw = True, eal_tol = 1e-8)
+assert S.last_solve_skipped
+for (name, g1), (name, g2) in zip(S.G_iw, G_iw_ref):
+    np.testing.assert_array_almost_equal(g1.data, g2.data)
+for (name, g1), (name, g2) in zip(S.Sigma_w, Sigma_w_ref):
+    np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# results that were not computed before cannot be reused
+S.solve(h_int = h_int, calc_gtau = True, eal_tol = 1e-8)
+assert not S.last_solve_skipped
+
+# a different interaction or shifted levels trigger a new solution
+S.solve(h_int = 2*h_int, eal_tol = 1e-8)
+assert not S.last_solve_skipped
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n - e_f - 1e-3 - V**2 * Wilson(D))
+S.solve(h_int = 2*h_int, eal_tol = 1e-8)
+assert not S.last_solve_skipped
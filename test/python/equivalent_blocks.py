@@ -0,0 +1,52 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+from triqs.operators import n
+import numpy as np
+
+# two orbitals with density-density interaction, paramagnetic
+U_mat, Uprime_mat = op.U_matrix_kanamori(n_orb=2, U_int=3.0, J_hund=0.5)
+gf_struct = [('up',2), ('down',2)]
+H = op.h_int_density(['up','down'], [0, 1], U_mat, Uprime_mat, off_diag=True)
+field = 0.1*sum(n('up', i) - n('down', i) for i in range(2))
+
+def solve(h, equivalent_blocks=None):
+    S = Solver(beta=20.0, gf_struct=gf_struct, n_iw=50)
+    S.G0_iw << inverse(iOmega_n + 2.0)
+    S.solve(h_int=h, equivalent_blocks=equivalent_blocks)
+    return S
+
+S_ref = solve(H)
+assert S_ref.equivalent_blocks is None
+assert solve(H, 'auto').equivalent_blocks == [['up', 'down']]
+
+for S in (solve(H, 'auto'), solve(H, [['up', 'down']])):
+    for name in ['up', 'down']:
+        np.testing.assert_array_almost_equal(S.G_iw[name].data, S_ref.G_iw[name].data)
+        np.testing.assert_array_almost_equal(S.Sigma_iw[name].data, S_ref.Sigma_iw[name].data)
+
+# a magnetic field breaks the equivalence
+assert solve(H + field, 'auto').equivalent_blocks == [['up'], ['down']]
@@ -0,0 +1,52 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+from triqs.operators.util.observables import LS_op
+import numpy as np
+
+# p shell with spin-orbit coupling in a single block
+mapping = {(spin, i): ('ud', i + 3*s) for s, spin in enumerate(['up','down']) for i in range(3)}
+U_mat = op.U_matrix_slater(l=1, U_int=4.0, J_hund=0.6, basis='spherical')
+H = op.h_int_slater(['up','down'], [0, 1, 2], U_mat, off_diag=True, map_operator_structure=mapping)
+H += 0.2*LS_op(['up','down'], 3, off_diag=True, map_operator_structure=mapping)
+
+S_ref = Solver(beta=40.0, gf_struct=[('ud',6)], n_iw=50)
+S_fock = Solver(beta=40.0, gf_struct=[('ud',6)], n_iw=50)
+
+# the interaction matrix is built in the first solve and reused in the second
+for mu in [4.0, 3.0]:
+    S_ref.G0_iw << inverse(iOmega_n + mu)
+    S_fock.G0_iw << inverse(iOmega_n + mu)
+    S_ref.solve(h_int=H, calc_dm=True)
+    S_fock.solve(h_int=H, calc_dm=True, backend='fock')
+    np.testing.assert_array_almost_equal(S_fock.G_iw['ud'].data, S_ref.G_iw['ud'].data)
+    np.testing.assert_array_almost_equal(S_fock.Sigma_iw['ud'].data, S_ref.Sigma_iw['ud'].data)
+    assert abs(sum(np.trace(d) for d in S_fock.dm) - 1) < 1e-10
+
+# restricted particle-number range
+S_fock.solve(h_int=H, backend='fock', energy_window=1.0)
+assert sum(len(e) for e in S_fock.ad.energies) < 2**6
+np.testing.assert_array_almost_equal(S_fock.G_iw['ud'].data, S_ref.G_iw['ud'].data)
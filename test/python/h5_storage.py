@@ -0,0 +1,69 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import n
+from h5 import HDFArchive
+import os
+import numpy as np
+
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=200)
+S.G0_iw << inverse(iOmega_n + 1.0)
+S.solve(h_int=2.0*n('up',0)*n('down',0), calc_gw=True, calc_gtau=True)
+
+sizes = dict()
+for policy in ['full', 'no_ad', 'results', 'lehmann', ['G_iw']]:
+    S.h5_storage = policy
+    filename = 'h5_storage_%s.out.h5'%policy if isinstance(policy, str) else 'h5_storage_list.out.h5'
+    with HDFArchive(filename,'w') as ar:
+        ar['Solver'] = S
+    sizes[str(policy)] = os.path.getsize(filename)
+
+    keys = S.__reduce_to_dict__().keys()
+    with HDFArchive(filename,'r') as ar:
+        S_read = ar['Solver']
+
+    assert ('ad' in keys) == (policy == 'full')
+    assert ('G0_iw' in keys) == (policy in ['full', 'no_ad', 'lehmann'])
+    assert ('G_tau' in keys) == (policy in ['full', 'no_ad', 'results'])
+    assert ('lehmann' in keys) == (policy == 'lehmann')
+    np.testing.assert_array_almost_equal(S_read.G_iw['up'].data, S.G_iw['up'].data)
+    np.testing.assert_array_almost_equal(S_read.eal['up'], S.eal['up'])
+    if policy != ['G_iw']:
+        np.testing.assert_array_almost_equal(S_read.Sigma_iw['up'].data, S.Sigma_iw['up'].data)
+        np.testing.assert_array_almost_equal(S_read.G_w['up'].data, S.G_w['up'].data)
+        np.testing.assert_array_almost_equal(S_read.G_tau['up'].data, S.G_tau['up'].data)
+    # the tail moments need the poles, which only the 'lehmann' policy stores
+    if policy == 'lehmann':
+        np.testing.assert_array_almost_equal(S_read.Sigma_moments()['up'], S.Sigma_moments()['up'])
+    else:
+        try:
+            S_read.Sigma_moments()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('Sigma_moments without stored poles')
+
+# the pole representation is much smaller than the dense meshes
+assert sizes['lehmann'] < sizes['no_ad']/10
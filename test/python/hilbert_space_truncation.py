@@ -0,0 +1,65 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+import numpy as np
+
+# t2g shell with Kanamori interaction, two electrons
+n_orbs, beta = 3, 40.0
+U_mat, Uprime_mat = op.U_matrix_kanamori(n_orb=n_orbs, U_int=4.0, J_hund=0.6)
+orb_names = list(range(n_orbs))
+gf_struct = op.set_operator_structure(['up','down'], orb_names, off_diag=True)
+H = op.h_int_kanamori(['up','down'], orb_names, U_mat, Uprime_mat, 0.6, off_diag=True)
+
+results = dict()
+for params in [{}, {'n_min': 1, 'n_max': 3}, {'energy_window': 1.0}]:
+    S = Solver(beta=beta, gf_struct=gf_struct, n_iw=50)
+    S.G0_iw << inverse(iOmega_n + 3.0)
+    S.solve(h_int=H, **params)
+    results[tuple(params)] = S
+
+assert results[()].particle_number_range is None
+assert results[('n_min', 'n_max')].particle_number_range == (1, 3)
+n_min, n_max = results[('energy_window',)].particle_number_range
+assert n_max - n_min < 2*n_orbs
+
+for S in results.values():
+    if S.particle_number_range is not None:
+        assert sum(len(e) for e in S.ad.energies) < 2**(2*n_orbs)
+    for name, g in S.G_iw:
+        np.testing.assert_array_almost_equal(g.data, results[()].G_iw[name].data)
+
+# a second solve keeps the range that still brackets the window without probing single sectors
+import triqs_hubbardI.solver
+def no_probing(*args, **kwargs):
+    raise AssertionError('sectors probed although the previous range brackets energy_window')
+probe = triqs_hubbardI.solver._particle_number_range
+triqs_hubbardI.solver._particle_number_range = no_probing
+S = results[('energy_window',)]
+S.solve(h_int=H, energy_window=1.0)
+triqs_hubbardI.solver._particle_number_range = probe
+assert S.particle_number_range == (n_min, n_max)
+for name, g in S.G_iw:
+    np.testing.assert_array_almost_equal(g.data, results[()].G_iw[name].data)
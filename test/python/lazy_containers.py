@@ -0,0 +1,55 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from h5 import HDFArchive
+from triqs.gf import *
+from triqs.operators import *
+import numpy as np
+
+D, V, U = 1.0, 0.2, 4.0
+e_f, beta = -U/2.0, 50
+S = Solver(beta = beta, gf_struct = [ ('up',1), ('down',1) ],n_iw=20,n_tau=30,n_w=20)
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n - e_f - V**2 * Wilson(D))
+
+lazy = ['G0_w', 'G_w', 'Sigma_w', 'G_tau', 'G_l']
+for name in lazy:
+    assert name not in S.__dict__
+
+S.solve(h_int = U * n('up',0) * n('down',0), calc_gtau = True)
+assert 'G_tau' in S.__dict__
+assert 'G_w' not in S.__dict__ and 'G_l' not in S.__dict__
+
+with HDFArchive("lazy_containers.h5",'w') as ar:
+    ar["Solver"] = S
+with HDFArchive("lazy_containers.h5",'r') as ar:
+    S_read = ar["Solver"]
+
+for (name, g1), (name, g2) in zip(S_read.G_tau, S.G_tau):
+    np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# containers not in the archive are allocated on first access
+assert 'G_tau' in S_read.__dict__
+assert 'G_w' not in S_read.__dict__
+assert S_read.G_w['up'].data.shape == (20, 1, 1)
+assert np.all(S_read.G_w['up'].data == 0)
@@ -0,0 +1,60 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import n
+from h5 import HDFArchive
+import numpy as np
+
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=100)
+S.G0_iw << inverse(iOmega_n + 1.0)
+S.solve(h_int=2.0*n('up',0)*n('down',0), calc_gw=True)
+
+with HDFArchive('lazy_restore.out.h5','w') as ar:
+    ar.create_group('dmft')
+    ar['dmft']['Solver'] = S
+    S.h5_storage = 'lehmann'
+    ar['dmft']['Solver_lehmann'] = S
+
+# nothing but the parameters is read or allocated until it is accessed
+S_lazy = Solver.from_archive('lazy_restore.out.h5', 'dmft/Solver')
+for name in ['G0_iw', 'G_iw', 'Sigma_iw', 'Sigma_w', 'ad']:
+    assert name not in S_lazy.__dict__
+np.testing.assert_array_almost_equal(S_lazy.eal['up'], S.eal['up'])
+
+np.testing.assert_array_almost_equal(S_lazy.Sigma_w['up'].data, S.Sigma_w['up'].data)
+assert 'Sigma_w' in S_lazy.__dict__ and 'G_iw' not in S_lazy.__dict__
+np.testing.assert_array_almost_equal(S_lazy.G_iw['up'].data, S.G_iw['up'].data)
+assert S_lazy.ad is not None
+
+# results stored as poles are evaluated on first access
+S_lazy = Solver.from_archive('lazy_restore.out.h5', 'dmft/Solver_lehmann')
+np.testing.assert_array_almost_equal(S_lazy.Sigma_w['up'].data, S.Sigma_w['up'].data)
+np.testing.assert_array_almost_equal(S_lazy.G_iw['up'].data, S.G_iw['up'].data)
+np.testing.assert_array_almost_equal(S_lazy.G_moments()['up'], S.G_moments()['up'])
+assert getattr(S_lazy, 'ad', None) is None
+
+# eager restore
+S_full = Solver.from_archive('lazy_restore.out.h5', 'dmft/Solver', lazy=False)
+np.testing.assert_array_almost_equal(S_full.G_iw['up'].data, S.G_iw['up'].data)
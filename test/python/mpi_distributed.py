@@ -0,0 +1,102 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+import numpy as np
+import pickle
+import threading
+
+class ThreadComm():
+    """
+    Minimal stand-in for an MPI communicator: every rank is a thread, and the
+    collectives exchange pickled copies of the objects, as MPI does.
+    """
+
+    def __init__(self, rank, shared):
+        self.rank, self.shared = rank, shared
+
+    def Get_rank(self):
+        return self.rank
+
+    def Get_size(self):
+        return len(self.shared['slots'])
+
+    def allgather(self, obj):
+        slots, barrier = self.shared['slots'], self.shared['barrier']
+        slots[self.rank] = pickle.dumps(obj)
+        barrier.wait()
+        res = [pickle.loads(x) for x in slots]
+        barrier.wait()
+        return res
+
+    def bcast(self, obj, root=0):
+        return self.allgather(obj if self.rank == root else None)[root]
+
+def run_ranks(n_ranks, fn):
+    """Run fn(comm) on n_ranks threads, return the results or exceptions of all ranks."""
+    shared = {'slots': [None]*n_ranks, 'barrier': threading.Barrier(n_ranks, timeout=120)}
+    res = [None]*n_ranks
+    def target(rank):
+        try:
+            res[rank] = fn(ThreadComm(rank, shared))
+        except Exception as e:
+            res[rank] = e
+    threads = [threading.Thread(target=target, args=(rank,)) for rank in range(n_ranks)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return res
+
+gf_struct = [('up',2), ('down',2)]
+U_mat, Uprime_mat = op.U_matrix_kanamori(n_orb=2, U_int=4.0, J_hund=0.7)
+H = op.h_int_kanamori(['up','down'], [0, 1], U_mat, Uprime_mat, 0.7, off_diag=True)
+mu = 3.0
+
+def solve(comm=None, **params):
+    S = Solver(beta=20.0, gf_struct=gf_struct, n_iw=100, n_tau=201, n_w=101, verbosity=0)
+    for name, g0 in S.G0_iw: g0 << inverse(iOmega_n + mu)
+    S.solve(h_int=H, calc_gw=True, calc_gtau=True, calc_dm=True, **params,
+            **({} if comm is None else {'mpi_mode': 'distributed', 'comm': comm}))
+    return S
+
+S_ref = solve(quantum_numbers='auto')
+
+# identical results on every rank
+for S in run_ranks(3, lambda comm: solve(comm, quantum_numbers='auto')):
+    assert not isinstance(S, Exception), S
+    assert S.quantum_numbers == S_ref.quantum_numbers
+    for key in ['hilbert_space_dim', 'subspace_sizes']:
+        assert S.last_solve_stats[key] == S_ref.last_solve_stats[key]
+    for name in ['G_iw', 'Sigma_iw', 'G_w', 'Sigma_w', 'G_tau']:
+        for block, g in getattr(S, name):
+            np.testing.assert_array_almost_equal(g.data, getattr(S_ref, name)[block].data)
+
+# invalid arguments are rejected on every rank
+for res in run_ranks(2, lambda comm: solve(comm, energy_window=5.0, n_max=3)):
+    assert isinstance(res, ValueError)
+
+# a failure of the diagonalization on the master rank reaches all ranks
+res = run_ranks(2, lambda comm: solve(comm, quantum_numbers=['not an operator']))
+assert isinstance(res[0], Exception) and not isinstance(res[0], threading.BrokenBarrierError)
+assert isinstance(res[1], RuntimeError)
@@ -0,0 +1,73 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import *
+import numpy as np
+
+beta, U = 50, 4.0
+gf_struct = [ ('up',1), ('down',1) ]
+levels = [-2.0, -1.5, -2.5]
+h_int = [U * n('up',0) * n('down',0), U * n('up',0) * n('down',0), 0.5*U * n('up',0) * n('down',0)]
+
+def setup():
+    MS = MultiImpuritySolver(beta, [gf_struct]*len(levels), n_iw=20, n_w=20)
+    for S, e_f in zip(MS, levels):
+        for name, g0 in S.G0_iw: g0 << inverse(iOmega_n - e_f)
+    return MS
+
+MS_serial = setup()
+MS_serial.solve(h_int, calc_gw=True)
+MS_pool = setup()
+MS_pool.solve(h_int, n_workers=2, calc_gw=True)
+
+assert len(MS_serial.Sigma_iw) == len(levels)
+for ish, e_f in enumerate(levels):
+    S = Solver(beta = beta, gf_struct = gf_struct, n_iw=20, n_w=20)
+    for name, g0 in S.G0_iw: g0 << inverse(iOmega_n - e_f)
+    S.solve(h_int = h_int[ish], calc_gw = True)
+    for MS in (MS_serial, MS_pool):
+        for name in ['G_iw', 'Sigma_iw', 'G_w', 'Sigma_w']:
+            for (block, g1), (block, g2) in zip(getattr(MS[ish], name), getattr(S, name)):
+                np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# the pool applies the same parameters as the serial solve
+eal = {'up': np.array([[-1.0]]), 'down': np.array([[-1.0]])}
+for params in [{'eal': eal}, {'equivalent_blocks': 'auto', 'eal_fit': 'lstsq'}]:
+    MS_serial, MS_pool = setup(), setup()
+    MS_serial.solve(h_int, **params)
+    MS_pool.solve(h_int, n_workers=2, **params)
+    for S1, S2 in zip(MS_serial, MS_pool):
+        assert S1.equivalent_blocks == S2.equivalent_blocks
+        assert S2.last_solve_stats['hilbert_space_dim'] == 4
+        np.testing.assert_array_almost_equal(S1.G_iw['up'].data, S2.G_iw['up'].data)
+        np.testing.assert_array_almost_equal(S1.Sigma_iw['down'].data, S2.Sigma_iw['down'].data)
+
+# parameters that the pool cannot apply are rejected, not ignored
+try:
+    setup().solve(h_int, n_workers=2, quantum_numbers='auto')
+except ValueError:
+    pass
+else:
+    raise AssertionError('quantum_numbers not rejected')
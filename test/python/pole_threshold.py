@@ -0,0 +1,47 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+import numpy as np
+
+# the d shell of hubbard_5orb, with many transitions of negligible weight at beta = 200
+spin_names, orb_names = ['up','down'], list(range(5))
+gf_struct = op.set_operator_structure(spin_names,orb_names,off_diag=True)
+H = op.h_int_slater(spin_names,orb_names,op.U_matrix_slater(l=2, U_int=6.0, J_hund=0.6, basis='spherical'),off_diag=True)
+
+S_full = Solver(beta=200.0, gf_struct=gf_struct, n_iw=100)
+S_full.G0_iw << inverse(iOmega_n + 1.0)
+S_full.solve(h_int=H)
+
+S_pruned = Solver(beta=200.0, gf_struct=gf_struct, n_iw=100)
+S_pruned.G0_iw << S_full.G0_iw
+S_pruned.solve(h_int=H, pole_threshold=1e-10)
+
+assert sum(S_pruned.lehmann.n_poles.values()) < sum(S_full.lehmann.n_poles.values())
+assert S_full.lehmann.error_bound_iw == 0
+
+for name, g in S_pruned.G_iw:
+    assert np.max(np.abs(g.data - S_full.G_iw[name].data)) <= S_pruned.lehmann.error_bound_iw + 1e-14
+    np.testing.assert_array_almost_equal(S_pruned.Sigma_iw[name].data, S_full.Sigma_iw[name].data)
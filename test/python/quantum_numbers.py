@@ -0,0 +1,67 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+import numpy as np
+from triqs_hubbardI.symmetry import detect_quantum_numbers
+
+# Slater p shell in the spherical basis: conserves N, Sz, Jz and the block occupations
+orb_names = [0, 1, 2]
+gf_struct = op.set_operator_structure(['up','down'],orb_names,off_diag=True)
+H = op.h_int_slater(['up','down'],orb_names,op.U_matrix_slater(l=1, U_int=4.0, J_hund=0.6, basis='spherical'),off_diag=True)
+
+qn = detect_quantum_numbers(H, gf_struct)
+assert set(['N', 'N_up', 'Sz', 'Jz']) <= set(qn.keys())
+
+S = Solver(beta=40.0, gf_struct=gf_struct, n_iw=50)
+S.G0_iw << inverse(iOmega_n + 4.0)
+S.solve(h_int=H)
+assert S.quantum_numbers is None
+G_ref = S.G_iw.copy()
+
+S.solve(h_int=H, quantum_numbers='auto')
+assert 'Jz' in S.quantum_numbers
+G_auto = S.G_iw.copy()
+
+S.solve(h_int=H, quantum_numbers=[qn['N'], qn['Sz']])
+assert sum(len(e) for e in S.ad.energies) == 2**6
+for name, g in S.G_iw:
+    np.testing.assert_array_almost_equal(g.data, G_ref[name].data)
+    np.testing.assert_array_almost_equal(G_auto[name].data, G_ref[name].data)
+
+# with spin-orbit coupling in a single block, Jz is conserved but Sz is not
+from triqs.operators.util.observables import LS_op
+mapping = {(spin, i): ('ud', i + 3*s) for s, spin in enumerate(['up','down']) for i in orb_names}
+H_soc = op.h_int_slater(['up','down'],orb_names,op.U_matrix_slater(l=1, U_int=4.0, J_hund=0.6, basis='spherical'),
+                        off_diag=True, map_operator_structure=mapping)
+H_soc += 0.2*LS_op(['up','down'], 3, off_diag=True, map_operator_structure=mapping)
+
+S_soc = Solver(beta=40.0, gf_struct=[('ud',6)], n_iw=50)
+S_soc.G0_iw << inverse(iOmega_n + 4.0)
+S_soc.solve(h_int=H_soc)
+G_ref = S_soc.G_iw.copy()
+S_soc.solve(h_int=H_soc, quantum_numbers='auto')
+assert 'Jz' in S_soc.quantum_numbers and 'Sz' not in S_soc.quantum_numbers
+np.testing.assert_array_almost_equal(S_soc.G_iw['ud'].data, G_ref['ud'].data)
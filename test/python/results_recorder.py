@@ -0,0 +1,81 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import n
+from h5 import HDFArchive
+import triqs.utility.mpi as mpi
+import numpy as np
+
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=50)
+S.G0_iw << inverse(iOmega_n + 1.0)
+
+written = []
+with ResultsRecorder('results_recorder.out.h5', 'DMFT_results/Iterations', max_queue=1, only_changed=True) as rec:
+    for it, U in enumerate([2.0, 2.0, 3.0]):
+        S.solve(h_int=U*n('up',0)*n('down',0), calc_gw=True)
+        written.append(rec.record_solver(S, it))
+        rec.record({'U': U}, group='parameters_it%d'%it)
+        # later changes do not affect the recorded snapshot
+        S.G_iw.zero()
+
+S.solve(h_int=3.0*n('up',0)*n('down',0))
+
+# only the master rank writes
+if mpi.is_master_node():
+    # G0 never changes, identical solves are only written as references
+    assert written[0] == ['G0_iw_it0', 'G_iw_it0', 'Sigma_iw_it0', 'G_w_it0', 'Sigma_w_it0']
+    assert written[1] == []
+    assert written[2] == ['G_iw_it2', 'Sigma_iw_it2', 'G_w_it2', 'Sigma_w_it2']
+
+    with HDFArchive('results_recorder.out.h5','r') as ar:
+        res = ar['DMFT_results']['Iterations']
+        assert res['G_iw_it1'] == '/DMFT_results/Iterations/G_iw_it0'
+        assert res['G0_iw_it2'] == '/DMFT_results/Iterations/G0_iw_it0'
+        assert res['parameters_it2']['U'] == 3.0
+        np.testing.assert_array_almost_equal(res['G_iw_it2']['up'].data, S.G_iw['up'].data)
+
+# by default every value is written
+with ResultsRecorder('results_recorder.out.h5', 'all') as rec:
+    for it in range(2):
+        assert rec.record_solver(S, it, names=['G0_iw']) == ['G0_iw_it%d'%it]
+if mpi.is_master_node():
+    with HDFArchive('results_recorder.out.h5','r') as ar:
+        np.testing.assert_array_almost_equal(ar['all']['G0_iw_it1']['up'].data, S.G0_iw['up'].data)
+
+# a file is used by one open recorder at a time, other h5 access takes the lock
+from triqs_hubbardI.recorder import h5_lock
+with ResultsRecorder('results_recorder.out.h5', 'locked') as rec:
+    if mpi.is_master_node():
+        try:
+            ResultsRecorder('results_recorder.out.h5')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('second recorder on the same file not rejected')
+    rec.record({'G_iw': S.G_iw})
+    rec.flush()
+    if mpi.is_master_node():
+        with h5_lock, HDFArchive('results_recorder.out.h5','r') as ar:
+            np.testing.assert_array_almost_equal(ar['locked']['G_iw']['up'].data, S.G_iw['up'].data)
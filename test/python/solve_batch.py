@@ -0,0 +1,67 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+import numpy as np
+
+beta = 40.0
+l = 1
+n_orbs = 2*l + 1
+mu = 4.0
+spin_names = ['up','down']
+orb_names = [i for i in range(n_orbs)]
+gf_struct = op.set_operator_structure(spin_names,orb_names,off_diag=True)
+
+def h_int(U, J):
+    U_mat = op.U_matrix_slater(l=l, U_int=U, J_hund=J, basis='spherical')
+    return op.h_int_slater(spin_names,orb_names,U_mat,off_diag=True)
+
+scan = [(U, 0.1*U) for U in [2.0, 3.0, 4.0]]
+
+S = Solver(beta=beta, gf_struct=gf_struct, n_iw=50, n_w=100)
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n + mu)
+
+eal = {block: -mu*np.eye(block_size) for block, block_size in gf_struct}
+configs = [{'h_int': h_int(U, J), 'key': (U, J)} for U, J in scan]
+configs += [{'h_int': h_int(U, J), 'eal': eal, 'key': ('eal', U, J)} for U, J in scan]
+
+serial = S.solve_batch(configs, calc_gw=True)
+pooled = S.solve_batch(configs, n_workers=2, calc_gw=True)
+
+for U, J in scan:
+    S.solve(h_int=h_int(U, J), calc_gw=True)
+    for res in (serial[(U, J)], pooled[(U, J)], serial[('eal', U, J)]):
+        for name in ['G_iw', 'Sigma_iw', 'G_w', 'Sigma_w']:
+            for (block, g1), (block, g2) in zip(res[name], getattr(S, name)):
+                np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# parameters that the batch cannot apply are rejected, not ignored
+for params in [{'quantum_numbers': 'auto'}, {'backend': 'fock'}, {'equivalent_blocks': 'auto'}, {'eal_tol': 1e-3}]:
+    try:
+        S.solve_batch(configs, **params)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('%s not rejected'%params)
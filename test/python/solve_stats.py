@@ -0,0 +1,76 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import n
+from h5 import HDFArchive
+import numpy as np
+
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=50)
+S.G0_iw << inverse(iOmega_n + 1.0)
+H = 2.0*n('up',0)*n('down',0)
+
+S.solve(h_int=H, calc_gw=True)
+stats = S.last_solve_stats
+assert not stats['skipped']
+for stage in ['eal', 'H_loc', 'diagonalization', 'lehmann', 'G_iw', 'G_w', 'Sigma_iw', 'Sigma_w']:
+    assert stats['stages'][stage]['time'] >= 0
+assert stats['hilbert_space_dim'] == 4
+assert stats['n_poles'] == {'up': 2, 'down': 2}
+assert stats['time'] >= sum(stage['time'] for stage in stats['stages'].values())
+
+# a skipped solve only fits the atomic levels
+S.solve(h_int=H, eal_tol=1e-6)
+S.solve(h_int=H, eal_tol=1e-6)
+assert S.last_solve_stats['skipped']
+assert list(S.last_solve_stats['stages'].keys()) == ['eal']
+
+total = S.cumulative_solve_stats
+assert total['n_solves'] == 3 and total['n_skipped'] == 1
+assert total['stages']['diagonalization'] >= stats['stages']['diagonalization']
+
+S.store_solve_stats = True
+with HDFArchive('solve_stats.out.h5','w') as ar:
+    ar['Solver'] = S
+with HDFArchive('solve_stats.out.h5','r') as ar:
+    S_read = ar['Solver']
+assert S_read.cumulative_solve_stats['n_solves'] == 3
+assert S_read.last_solve_stats['skipped']
+
+S.reset_solve_stats()
+assert S.cumulative_solve_stats['n_solves'] == 0
+
+# the memory of every stage is recorded separately
+import tracemalloc
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=50, n_w=100000)
+S.G0_iw << inverse(iOmega_n + 1.0)
+tracemalloc.start()
+S.solve(h_int=H, calc_gw=True)
+tracemalloc.stop()
+stages = S.last_solve_stats['stages']
+for stage in stages.values():
+    assert 'rss_delta_mb' in stage and 'peak_increase_mb' in stage
+# G_w allocates two blocks of n_w complex numbers, the atomic levels almost nothing
+assert stages['G_w']['traced_peak_mb'] >= 2*16*S.n_w/2**20
+assert stages['eal']['traced_peak_mb'] < stages['G_w']['traced_peak_mb']
@@ -0,0 +1,57 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import *
+import numpy as np
+
+U = 4.0
+e_f = -U/2.0
+h_int = U * n('up',0) * n('down',0)
+gf_struct = [ ('up',1), ('down',1) ]
+betas = [10.0, 20.0, 50.0]
+
+S = Solver(beta = betas[0], gf_struct = gf_struct, n_iw=20, n_w=20)
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n - e_f)
+results = S.solve_temperatures(betas, h_int = h_int, calc_gw = True)
+
+# one solver per temperature gives the same results
+for beta in betas:
+    S_beta = Solver(beta = beta, gf_struct = gf_struct, n_iw=20, n_w=20)
+    for name, g0 in S_beta.G0_iw: g0 << inverse(iOmega_n - e_f)
+    S_beta.solve(h_int = h_int, calc_gw = True)
+
+    assert results[beta]['G_iw']['up'].mesh.beta == beta
+    for name in ['G_iw', 'Sigma_iw', 'G_w', 'Sigma_w']:
+        for (block, g1), (block, g2) in zip(results[beta][name], getattr(S_beta, name)):
+            np.testing.assert_array_almost_equal(g1.data, g2.data)
+
+# parameters that cannot be applied to all temperatures are rejected, not ignored
+for params in [{'equivalent_blocks': 'auto'}, {'eal_tol': 1e-3}, {'calc_dlr': True}]:
+    try:
+        S.solve_temperatures(betas, h_int = h_int, **params)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('%s not rejected'%params)
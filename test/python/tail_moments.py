@@ -0,0 +1,71 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+import triqs.operators.util as op
+from triqs.operators import n
+import numpy as np
+
+# half-filled Hubbard atom: Sigma = U/2 + U^2/4 / iw, G moments 1, 0, U^2/4
+U, e_f = 4.0, -2.0
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=100)
+S.G0_iw << inverse(iOmega_n - e_f)
+S.solve(h_int=U*n('up',0)*n('down',0))
+
+Sigma_moments = S.Sigma_moments()
+G_moments = S.G_moments(n_moments=3)
+for name in ['up', 'down']:
+    np.testing.assert_array_almost_equal(Sigma_moments[name], [[[U/2]], [[U**2/4]]])
+    np.testing.assert_array_almost_equal(G_moments[name], [[[0]], [[1]], [[0]], [[U**2/4]]])
+    np.testing.assert_array_almost_equal(S.density()[name], [[0.5]])
+
+# p shell with off-diagonal blocks, away from half filling
+beta = 40.0
+spin_names = ['up','down']
+orb_names = [0, 1, 2]
+gf_struct = op.set_operator_structure(spin_names,orb_names,off_diag=True)
+U_mat = op.U_matrix_slater(l=1, U_int=U, J_hund=0.6, basis='spherical')
+H = op.h_int_slater(spin_names,orb_names,U_mat,off_diag=True)
+mu = 5.0
+
+S = Solver(beta=beta, gf_struct=gf_struct, n_iw=4000)
+for name, g0 in S.G0_iw: g0 << inverse(iOmega_n + mu)
+S.solve(h_int=H, calc_gtau=True)
+
+# the tail of Sigma_iw at the largest frequency
+Sigma_moments = S.Sigma_moments()
+for name, sigma in S.Sigma_iw:
+    iw = 1j*np.pi*(2*S.n_iw - 1)/beta
+    X = sigma.data[-1] - Sigma_moments[name][0]
+    np.testing.assert_array_almost_equal(0.5*(X + X.conj().T), 0, decimal=4)
+    X *= iw
+    np.testing.assert_array_almost_equal(0.5*(X + X.conj().T), Sigma_moments[name][1], decimal=3)
+
+# densities from a few hundred frequencies with the exact moments
+S_small = Solver(beta=beta, gf_struct=gf_struct, n_iw=200)
+for name, g0 in S_small.G0_iw: g0 << inverse(iOmega_n + mu)
+S_small.solve(h_int=H)
+density = S_small.density()
+for name, g in S.G_tau:
+    np.testing.assert_array_almost_equal(np.diag(density[name]), -np.diag(g.data[-1]), decimal=6)
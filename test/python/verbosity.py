@@ -0,0 +1,51 @@
+###############################################################################
+#
+# hubbardI: A TRIQS based hubbardI solver
+#
+# Copyright (c) 2026 The Simons Foundation
+#
+# hubbardI is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# hubbardI is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# hubbardI. If not, see <http://www.gnu.org/licenses/>.
+#
+##############################################################################
+#!/usr/bin/env python
+
+
+from triqs_hubbardI import *
+from triqs.gf import *
+from triqs.operators import n
+from contextlib import redirect_stdout
+import io
+import numpy as np
+
+H = 2.0*n('up',0)*n('down',0)
+
+def output(S, **params):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        S.solve(h_int=H, **params)
+    return out.getvalue()
+
+S = Solver(beta=40.0, gf_struct=[('up',1),('down',1)], n_iw=50, verbosity=0)
+S.G0_iw << inverse(iOmega_n + 1.0)
+
+assert output(S) == ''
+
+# compact summary instead of the full operator
+out = output(S, verbosity=1)
+assert '3 terms, Hilbert space dimension 4' in out
+assert 'c_dag(' not in out
+assert S.verbosity == 0
+
+S.verbosity = 2
+assert 'c_dag(' in output(S)